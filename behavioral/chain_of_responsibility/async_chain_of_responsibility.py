@@ -0,0 +1,149 @@
+import asyncio
+import inspect
+import pickle
+import time
+from abc import ABC, abstractmethod
+from typing import Awaitable, List, Optional, Union
+
+from behavioral.chain_of_responsibility.chain_of_responsibility import (
+    ADMIN_GROUP_NAME,
+    AuthorizationHandler,
+    HandlerInterface,
+    PayloadHandler,
+    validates_itself,
+)
+from behavioral.chain_of_responsibility.exceptions import InvalidRequestError
+from behavioral.chain_of_responsibility.request import Request
+
+
+class AsyncHandlerInterface(ABC):
+    """
+    An interface that must be implemented by all handlers
+    that do I/O while validating a request.
+    """
+
+    @abstractmethod
+    async def validate(self, request: Request):
+        """
+        Validates a request using its internal parameters.
+        """
+
+
+AnyHandler = Union[HandlerInterface, AsyncHandlerInterface]
+
+
+class AsyncBaseHandler(AsyncHandlerInterface):
+    """
+    The basic class for asynchronous handlers.
+    Async handlers can be chained with the synchronous ones in any order,
+    such a chain must be validated with validate_chain.
+    Consecutive handlers marked as independent are run concurrently.
+    """
+
+    def __init__(self, independent: bool = False):
+        self._next_handler: Optional[AnyHandler] = None
+        self.independent = independent
+
+    @property
+    def next_handler(self) -> Optional[AnyHandler]:
+        return self._next_handler
+
+    def set_next_handler(self, next_handler: AnyHandler):
+        self._next_handler = next_handler
+
+    async def check(self, request: Request):
+        """
+        Validates a request with this handler only,
+        without passing it to the next handler.
+        """
+
+    async def validate(self, request: Request):
+        await validate_chain(self, request)
+
+
+async def validate_chain(head_handler: AnyHandler, request: Request):
+    """
+    Walks a chain that may contain both sync and async handlers.
+    Sync handlers are called in place, so they must not block for long.
+    The first rejection stops the chain and cancels the running checks.
+    """
+    handler: Optional[AnyHandler] = head_handler
+    while handler:
+        if _checks_async(handler):
+            if not handler.independent:
+                await handler.check(request)
+                handler = handler.next_handler
+                continue
+
+            group: List[Awaitable] = []
+            while _checks_async(handler) and handler.independent:
+                group.append(asyncio.ensure_future(handler.check(request)))
+                handler = handler.next_handler
+            try:
+                await asyncio.gather(*group)
+            except BaseException:
+                for task in group:
+                    task.cancel()
+                raise
+        elif not validates_itself(handler):
+            handler.check(request)
+            handler = handler.next_handler
+        else:
+            # the handler validates the rest of the chain itself
+            result = handler.validate(request)
+            if inspect.isawaitable(result):
+                await result
+            return
+
+
+def _checks_async(handler: Optional[AnyHandler]) -> bool:
+    """
+    Returns True for an async handler which splits its validation into check.
+    An async handler which overrides validate validates the rest of the chain
+    itself, like a sync handler which does.
+    """
+    return (
+        isinstance(handler, AsyncBaseHandler)
+        and type(handler).validate is AsyncBaseHandler.validate
+    )
+
+
+class SlowUserLookupHandler(AsyncBaseHandler):
+    """
+    Imitates a validator that calls an external service,
+    e.g. checks that the user is not blocked.
+    """
+
+    def __init__(self, delay: float, independent: bool = True):
+        super(SlowUserLookupHandler, self).__init__(independent)
+        self._delay = delay
+
+    async def check(self, request: Request):
+        await asyncio.sleep(self._delay)
+        if request.user and request.user.get("blocked"):
+            raise InvalidRequestError("User is blocked")
+
+
+if __name__ == "__main__":
+    # client code
+    delay: float = 0.2
+    auth_handler = AuthorizationHandler()
+    lookup_handlers = [SlowUserLookupHandler(delay) for _ in range(3)]
+    payload_handler = PayloadHandler()
+
+    auth_handler.set_next_handler(lookup_handlers[0])
+    lookup_handlers[0].set_next_handler(lookup_handlers[1])
+    lookup_handlers[1].set_next_handler(lookup_handlers[2])
+    lookup_handlers[2].set_next_handler(payload_handler)
+
+    token: bytes = pickle.dumps({"name": "Aleksei", "group": ADMIN_GROUP_NAME})
+    request_to_validate = Request(
+        headers={"Authorization": token}, body={"name": "Aleksei"}
+    )
+
+    started_at: float = time.perf_counter()
+    asyncio.run(validate_chain(auth_handler, request_to_validate))
+    elapsed: float = time.perf_counter() - started_at
+
+    # independent handlers run concurrently: latency is the max, not the sum
+    print(f"Validated in {elapsed:.3f}s with 3 lookups of {delay}s each")
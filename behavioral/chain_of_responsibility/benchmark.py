@@ -0,0 +1,78 @@
+"""
+Benchmarks for the handler chains.
+Run with: python -m behavioral.chain_of_responsibility.benchmark
+"""
+
+import pickle
+import time
+from typing import Callable, List
+
+from behavioral.chain_of_responsibility.chain_of_responsibility import (
+    ADMIN_GROUP_NAME,
+    AuthorizationHandler,
+    BaseHandler,
+    PayloadHandler,
+    UserGroupHandler,
+)
+from behavioral.chain_of_responsibility.pipeline import HandlerPipeline
+from behavioral.chain_of_responsibility.request import Request
+
+
+def build_chain(depth: int) -> BaseHandler:
+    """
+    Builds a chain of the given depth: an authorization handler
+    followed by alternating group and payload handlers.
+    """
+    head: BaseHandler = AuthorizationHandler()
+    tail: BaseHandler = head
+    for i in range(depth - 1):
+        handler: BaseHandler = UserGroupHandler() if i % 2 == 0 else PayloadHandler()
+        tail.set_next_handler(handler)
+        tail = handler
+    return head
+
+
+def build_request() -> Request:
+    token: bytes = pickle.dumps({"name": "Aleksei", "group": ADMIN_GROUP_NAME})
+    return Request(headers={"Authorization": token}, body={"name": "Aleksei"})
+
+
+def requests_per_second(
+    validate: Callable[[Request], None], requests: List[Request]
+) -> float:
+    started_at: float = time.perf_counter()
+    for request in requests:
+        validate(request)
+    return len(requests) / (time.perf_counter() - started_at)
+
+
+def benchmark_chain_depths(depths=(3, 30, 300), number_of_requests: int = 20000):
+    requests: List[Request] = [build_request() for _ in range(number_of_requests)]
+    print(f"{'depth':>6} {'linked req/s':>14} {'pipeline req/s':>16} {'speedup':>8}")
+    for depth in depths:
+        head: BaseHandler = build_chain(depth)
+        pipeline = HandlerPipeline.from_chain(head)
+        linked: float = requests_per_second(head.validate, requests)
+        compiled: float = requests_per_second(pipeline.validate, requests)
+        print(
+            f"{depth:>6} {linked:>14.0f} {compiled:>16.0f} {compiled / linked:>7.2f}x"
+        )
+
+
+def benchmark_batch_validation(depth: int = 30, number_of_requests: int = 20000):
+    requests: List[Request] = [build_request() for _ in range(number_of_requests)]
+    head: BaseHandler = build_chain(depth)
+    one_by_one: float = requests_per_second(head.validate, requests)
+
+    started_at: float = time.perf_counter()
+    head.validate_many(requests)
+    batched: float = number_of_requests / (time.perf_counter() - started_at)
+    print(
+        f"depth {depth}: validate {one_by_one:.0f} req/s,"
+        f" validate_many {batched:.0f} req/s"
+    )
+
+
+if __name__ == "__main__":
+    benchmark_chain_depths()
+    benchmark_batch_validation()
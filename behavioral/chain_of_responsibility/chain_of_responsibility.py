@@ -1,11 +1,38 @@
+import inspect
 import pickle
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from behavioral.chain_of_responsibility.exceptions import InvalidRequestError
 from behavioral.chain_of_responsibility.request import Request
-
+from behavioral.chain_of_responsibility.token_cache import TokenCache
 
 ADMIN_GROUP_NAME: str = "admin"
+# pickle.loads raises all of these on malformed or truncated data
+TOKEN_DECODE_ERRORS = (
+    pickle.UnpicklingError,
+    EOFError,
+    ValueError,
+    TypeError,
+    AttributeError,
+    ImportError,
+    IndexError,
+    KeyError,
+)
+
+
+def _try_decode_token(auth_token: bytes) -> Tuple[bool, Any]:
+    """
+    Decodes a token in a worker process.
+    Returns (False, None) instead of raising so that one bad token
+    does not break the whole batch, and (True, decoded token) otherwise,
+    as a token can decode to any value, None included.
+    """
+    try:
+        return True, pickle.loads(auth_token)
+    except TOKEN_DECODE_ERRORS:
+        return False, None
 
 
 class HandlerInterface(ABC):
@@ -30,58 +57,223 @@ class BaseHandler(HandlerInterface):
 
     def __init__(self):
         self._next_handler = None
+        self._next_handler_is_async: bool = False
+
+    @property
+    def next_handler(self) -> Optional[HandlerInterface]:
+        return self._next_handler
 
     def set_next_handler(self, next_handler: HandlerInterface):
         self._next_handler = next_handler
+        self._next_handler_is_async = is_async_handler(next_handler)
+
+    def check(self, request: Request):
+        """
+        Validates a request with this handler only,
+        without passing it to the next handler.
+        """
+
+    def check_many(
+        self, requests: Sequence[Request]
+    ) -> List[Optional[InvalidRequestError]]:
+        """
+        Checks a batch of requests with this handler only.
+        Returns an error for each rejected request and None for the rest.
+        """
+        errors: List[Optional[InvalidRequestError]] = []
+        for request in requests:
+            try:
+                self.check(request)
+            except InvalidRequestError as e:
+                errors.append(e)
+                continue
+            errors.append(None)
+        return errors
 
     def validate(self, request: Request):
+        self.check(request)
         if self._next_handler:
+            if self._next_handler_is_async:
+                raise_async_handler_error(self._next_handler)
             return self._next_handler.validate(request)
         return None
 
+    def validate_many(
+        self, requests: Sequence[Request]
+    ) -> List[Optional[InvalidRequestError]]:
+        """
+        Validates a batch of requests stage by stage:
+        each handler checks the whole batch before the next one starts.
+        Rejected requests are not passed to the next handlers.
+        Returns an error for each rejected request and None for the valid ones.
+        """
+        errors: List[Optional[InvalidRequestError]] = [None] * len(requests)
+        pending: List[int] = list(range(len(requests)))
+        handler: Optional[HandlerInterface] = self
+        while handler and pending:
+            batch: List[Request] = [requests[i] for i in pending]
+            if not validates_itself(handler):
+                stage_errors = handler.check_many(batch)
+                handler = handler.next_handler
+            else:
+                # the handler validates the rest of the chain itself
+                if is_async_handler(handler):
+                    raise_async_handler_error(handler)
+                stage_errors = [_validate_or_error(handler, r) for r in batch]
+                handler = None
+
+            still_pending: List[int] = []
+            for i, error in zip(pending, stage_errors):
+                if error is None:
+                    still_pending.append(i)
+                else:
+                    errors[i] = error
+            pending = still_pending
+        return errors
+
+
+def validates_itself(handler: HandlerInterface) -> bool:
+    """
+    Returns True if the handler does not split its validation into check,
+    i.e. it is not inherited from BaseHandler or overrides validate.
+    Such a handler validates the rest of the chain itself.
+    """
+    return (
+        not isinstance(handler, BaseHandler)
+        or type(handler).validate is not BaseHandler.validate
+    )
+
+
+def is_async_handler(handler: HandlerInterface) -> bool:
+    return inspect.iscoroutinefunction(handler.validate)
+
+
+def raise_async_handler_error(handler: HandlerInterface):
+    """
+    A chain with async handlers can't be validated synchronously:
+    the async validation would never be awaited and the request would pass.
+    """
+    raise TypeError(
+        f"{type(handler).__name__} is asynchronous, "
+        f"validate the chain with validate_chain instead"
+    )
+
+
+def _validate_or_error(
+    handler: HandlerInterface, request: Request
+) -> Optional[InvalidRequestError]:
+    try:
+        handler.validate(request)
+    except InvalidRequestError as e:
+        return e
+    return None
+
 
 class PayloadHandler(BaseHandler):
     """
     Validates a request payload.
     """
 
-    def validate(self, request: Request):
+    def check(self, request: Request):
         if not isinstance(request.body, dict):
             raise InvalidRequestError("Request body is invalid")
-        return super(PayloadHandler, self).validate(request)
 
 
 class AuthorizationHandler(BaseHandler):
     """
     Ensures that "Authorization" header of the request
     is valid.
+    If a token cache is given, decoded tokens are taken from it
+    instead of being deserialized on every request.
+    If a decode executor is given (e.g. ProcessPoolExecutor),
+    large batches decode their tokens on it.
     """
 
-    def validate(self, request: Request):
+    def __init__(
+        self,
+        token_cache: Optional[TokenCache] = None,
+        decode_executor: Optional[Executor] = None,
+        parallel_decode_min_batch: int = 1000,
+        decode_chunksize: int = 256,
+    ):
+        super(AuthorizationHandler, self).__init__()
+        self._token_cache = token_cache
+        self._decode_executor = decode_executor
+        self._parallel_decode_min_batch = parallel_decode_min_batch
+        self._decode_chunksize = decode_chunksize
+
+    def check(self, request: Request):
         auth_token: bytes = request.headers.get("Authorization")
         if not auth_token:
             raise InvalidRequestError("Authorization token is missing")
 
+        if self._token_cache is not None:
+            decoded_token: Optional[dict] = self._token_cache.get(auth_token)
+            if decoded_token is None:
+                decoded_token = self._decode_token(auth_token)
+                self._token_cache.put(auth_token, decoded_token)
+        else:
+            decoded_token = self._decode_token(auth_token)
+
+        request.user = decoded_token
+
+    def check_many(
+        self, requests: Sequence[Request]
+    ) -> List[Optional[InvalidRequestError]]:
+        if (
+            self._decode_executor is None
+            or len(requests) < self._parallel_decode_min_batch
+        ):
+            return super(AuthorizationHandler, self).check_many(requests)
+
+        errors: List[Optional[InvalidRequestError]] = [None] * len(requests)
+        # the same token is decoded only once per batch
+        requests_by_token: Dict[bytes, List[int]] = {}
+        for i, request in enumerate(requests):
+            auth_token: bytes = request.headers.get("Authorization")
+            if not auth_token:
+                errors[i] = InvalidRequestError("Authorization token is missing")
+                continue
+            if self._token_cache is not None:
+                decoded_token: Optional[dict] = self._token_cache.get(auth_token)
+                if decoded_token is not None:
+                    request.user = decoded_token
+                    continue
+            requests_by_token.setdefault(auth_token, []).append(i)
+
+        tokens: List[bytes] = list(requests_by_token)
+        results = self._decode_executor.map(
+            _try_decode_token, tokens, chunksize=self._decode_chunksize
+        )
+        for auth_token, (decoded, decoded_token) in zip(tokens, results):
+            if not decoded:
+                for i in requests_by_token[auth_token]:
+                    errors[i] = InvalidRequestError("Authorization token is invalid")
+                continue
+            if self._token_cache is not None:
+                self._token_cache.put(auth_token, decoded_token)
+            for i in requests_by_token[auth_token]:
+                requests[i].user = decoded_token
+        return errors
+
+    @staticmethod
+    def _decode_token(auth_token: bytes) -> dict:
         try:
             # a dummy validation, good apps use JWT
-            decoded_token: dict = pickle.loads(auth_token)
-        except pickle.UnpicklingError as e:
+            return pickle.loads(auth_token)
+        except TOKEN_DECODE_ERRORS as e:
             print(f"Error occurred while validating a token. Error: {str(e)}")
             raise InvalidRequestError("Authorization token is invalid")
 
-        request.user = decoded_token
-        return super(AuthorizationHandler, self).validate(request)
-
 
 class UserGroupHandler(BaseHandler):
     """
     Checks that user's group is admin if a user is authorized.
     """
 
-    def validate(self, request: Request):
+    def check(self, request: Request):
         if request.user and request.user["group"] != ADMIN_GROUP_NAME:
             raise InvalidRequestError("User must be an admin to proceed.")
-        return super(UserGroupHandler, self).validate(request)
 
 
 if __name__ == "__main__":
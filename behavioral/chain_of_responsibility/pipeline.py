@@ -0,0 +1,72 @@
+import pickle
+from typing import Callable, List
+
+from behavioral.chain_of_responsibility.chain_of_responsibility import (
+    ADMIN_GROUP_NAME,
+    AuthorizationHandler,
+    HandlerInterface,
+    PayloadHandler,
+    UserGroupHandler,
+    is_async_handler,
+    raise_async_handler_error,
+    validates_itself,
+)
+from behavioral.chain_of_responsibility.request import Request
+
+
+class HandlerPipeline(HandlerInterface):
+    """
+    A compiled version of a handler chain.
+    Instead of passing the request from one handler to another,
+    runs the pre-bound checks of all handlers in a loop.
+    The chain is not copied, so handlers keep their own state.
+    """
+
+    def __init__(self, checks: List[Callable[[Request], None]]):
+        self._checks = checks
+
+    @classmethod
+    def from_chain(cls, head_handler: HandlerInterface) -> "HandlerPipeline":
+        """
+        Walks the chain starting from the head handler and
+        collects the checks of all handlers.
+        A handler that is not inherited from BaseHandler or overrides validate
+        validates the rest of the chain itself, so the walk stops there.
+        Raises TypeError if the chain contains an async handler.
+        """
+        checks: List[Callable[[Request], None]] = []
+        handler = head_handler
+        while handler:
+            if is_async_handler(handler):
+                raise_async_handler_error(handler)
+            if validates_itself(handler):
+                checks.append(handler.validate)
+                break
+            checks.append(handler.check)
+            handler = handler.next_handler
+        return cls(checks)
+
+    def __len__(self) -> int:
+        return len(self._checks)
+
+    def validate(self, request: Request):
+        for check in self._checks:
+            check(request)
+
+
+if __name__ == "__main__":
+    # client code
+    auth_handler = AuthorizationHandler()
+    group_handler = UserGroupHandler()
+    payload_handler = PayloadHandler()
+
+    auth_handler.set_next_handler(group_handler)
+    group_handler.set_next_handler(payload_handler)
+
+    pipeline = HandlerPipeline.from_chain(auth_handler)
+
+    token: bytes = pickle.dumps({"name": "Aleksei", "group": ADMIN_GROUP_NAME})
+    request_to_validate = Request(
+        headers={"Authorization": token}, body={"name": "Aleksei"}
+    )
+    pipeline.validate(request_to_validate)
@@ -1,13 +1,104 @@
+import json
+from collections.abc import Mapping
+from typing import Iterator, Optional, Union
+
+RawBuffer = Union[bytes, bytearray, memoryview]
+
+_NOT_PARSED = object()
+
+
+class Headers(Mapping):
+    """
+    Case-insensitive read-only request headers.
+    Header names are stored in lower case.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Optional[dict] = None):
+        self._values: dict = {
+            name.lower(): value for name, value in (values or {}).items()
+        }
+
+    @classmethod
+    def from_raw(cls, raw_headers: RawBuffer) -> "Headers":
+        """
+        Parses a raw header block: "Name: value" lines separated by CRLF.
+        Values are kept as bytes.
+        """
+        headers = cls()
+        for line in bytes(raw_headers).split(b"\r\n"):
+            name, separator, value = line.partition(b":")
+            if separator:
+                headers._values[name.strip().decode("latin-1").lower()] = value.strip(
+                    b" \t"
+                )
+        return headers
+
+    def __getitem__(self, name: str):
+        return self._values[name.lower()]
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and name.lower() in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
 class Request:
     """
     The class that represents a request that should be validated.
+    A request can be built from raw header and body buffers,
+    in this case headers are parsed on first access and
+    the JSON body is decoded only when a handler touches it.
     """
 
+    __slots__ = ("_headers", "_raw_headers", "_body", "_raw_body", "_user")
+
     def __init__(self, headers: dict, body: dict):
-        self.headers = headers
-        self.body = body
+        self._headers: Optional[Headers] = Headers(headers)
+        self._raw_headers: Optional[RawBuffer] = None
+        self._body = body
+        self._raw_body: Optional[RawBuffer] = None
         self._user = None
 
+    @classmethod
+    def from_raw(cls, raw_headers: RawBuffer, raw_body: RawBuffer) -> "Request":
+        request = cls.__new__(cls)
+        request._headers = None
+        request._raw_headers = raw_headers
+        request._body = _NOT_PARSED
+        request._raw_body = raw_body
+        request._user = None
+        return request
+
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers.from_raw(self._raw_headers)
+            self._raw_headers = None
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: dict):
+        self._headers = Headers(value)
+        self._raw_headers = None
+
+    @property
+    def body(self):
+        if self._body is _NOT_PARSED:
+            self._body = self._decode_body(self._raw_body)
+            self._raw_body = None
+        return self._body
+
+    @body.setter
+    def body(self, value: dict):
+        self._body = value
+        self._raw_body = None
+
     @property
     def user(self):
         return self._user
@@ -15,3 +106,13 @@ class Request:
     @user.setter
     def user(self, value: dict):
         self._user = value
+
+    @staticmethod
+    def _decode_body(raw_body: RawBuffer):
+        """
+        Returns the decoded JSON body or None if the body is not a valid JSON.
+        """
+        try:
+            return json.loads(bytes(raw_body))
+        except ValueError:
+            return None
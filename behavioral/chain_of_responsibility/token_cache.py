@@ -0,0 +1,77 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# values which are shared between the copies of a decoded token
+IMMUTABLE_TYPES: Tuple[type, ...] = (str, bytes, int, float, bool, type(None))
+
+
+class TokenCache:
+    """
+    A thread-safe LRU cache of decoded authorization tokens.
+    Entries expire after ttl seconds, and the least recently used
+    entry is evicted when the cache is full.
+    The cache keeps its own copy of a decoded token and returns a new copy
+    on every hit, so changing request.user does not change the cached token.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 300.0):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._max_entries = max_entries
+        self._ttl = ttl
+        # token -> (expires_at, decoded token, whether it has only immutable values)
+        self._entries: "OrderedDict[bytes, Tuple[float, dict, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, token: bytes) -> Optional[dict]:
+        """
+        Returns a decoded token or None if it is not cached or expired.
+        """
+        with self._lock:
+            entry: Optional[Tuple[float, dict, bool]] = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, decoded_token, is_flat = entry
+            if expires_at <= time.monotonic():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+        return _copy_token(decoded_token, is_flat)
+
+    def put(self, token: bytes, decoded_token: dict):
+        is_flat: bool = isinstance(decoded_token, dict) and all(
+            isinstance(value, IMMUTABLE_TYPES) for value in decoded_token.values()
+        )
+        decoded_token = _copy_token(decoded_token, is_flat)
+        with self._lock:
+            self._entries[token] = (
+                time.monotonic() + self._ttl,
+                decoded_token,
+                is_flat,
+            )
+            self._entries.move_to_end(token)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _copy_token(decoded_token: dict, is_flat: bool) -> dict:
+    """
+    A token with only immutable values is copied shallowly,
+    which is much cheaper than decoding it again.
+    """
+    return dict(decoded_token) if is_flat else copy.deepcopy(decoded_token)
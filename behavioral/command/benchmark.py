@@ -0,0 +1,272 @@
+"""
+Benchmarks for the command transactions.
+Run with: python -m behavioral.command.benchmark
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+import requests
+
+from behavioral.command.carrier import DB, Carrier
+from behavioral.command.carrier_store import CarrierStore
+from behavioral.journal import TransactionJournal
+from behavioral.command.command import CommandInterface, SaveCarrierCommand, Transaction
+from behavioral.command.spatial_index import GeoGridIndex
+from behavioral.command.zone_api_client import ZoneApiClient
+from behavioral.command.zone_api_stub import ZoneApiStubServer
+
+
+class FailingCommand(CommandInterface):
+    """
+    Fails the transaction to measure the rollback.
+    """
+
+    def execute(self):
+        raise RuntimeError("Forced failure")
+
+    def undo(self):
+        pass
+
+
+def run_transaction(
+    carriers: List[Carrier], coalesce_writes: bool, fail: bool
+) -> float:
+    transaction = Transaction(coalesce_writes=coalesce_writes)
+    for carrier in carriers:
+        transaction.register_command(SaveCarrierCommand(carrier))
+    if fail:
+        transaction.register_command(FailingCommand())
+
+    started_at: float = time.perf_counter()
+    transaction.execute()
+    return time.perf_counter() - started_at
+
+
+def benchmark_save_coalescing(sizes=(10_000, 1_000_000)):
+    print(
+        f"{'carriers':>10} {'mode':>10}"
+        f" {'commit carriers/s':>18} {'rollback carriers/s':>20}"
+    )
+    for size in sizes:
+        carriers: List[Carrier] = [
+            Carrier("John", "Doe", 12.32, 54.21) for _ in range(size)
+        ]
+        for coalesce_writes in (False, True):
+            commit_time: float = run_transaction(carriers, coalesce_writes, fail=False)
+            DB.clear()
+            rollback_time: float = run_transaction(carriers, coalesce_writes, fail=True)
+            assert not DB
+            mode: str = "bulk" if coalesce_writes else "one-by-one"
+            print(
+                f"{size:>10} {mode:>10}"
+                f" {size / commit_time:>18.0f} {size / rollback_time:>20.0f}"
+            )
+
+
+def benchmark_zone_assignment(number_of_carriers: int = 2000, latency: float = 0.001):
+    """
+    Compares the ways of assigning carriers to zones
+    against a local stand-in of the zones microservice.
+    """
+    carriers: List[Carrier] = [
+        Carrier("John", "Doe", 12.32, 54.21) for _ in range(number_of_carriers)
+    ]
+    with ZoneApiStubServer(latency=latency) as zone_api:
+        client = ZoneApiClient(zone_api.url, max_connections=16)
+
+        def new_connection_per_carrier():
+            for carrier in carriers:
+                requests.put(
+                    f"{zone_api.url}/zones/{carrier.carrier_id}",
+                    json={"latitude": carrier.latitude, "longitude": carrier.longitude},
+                ).raise_for_status()
+
+        def pooled_sequential():
+            for carrier in carriers:
+                client.send(
+                    "PUT",
+                    f"zones/{carrier.carrier_id}",
+                    {"latitude": carrier.latitude, "longitude": carrier.longitude},
+                )
+
+        def pooled_concurrent():
+            client.send_many(
+                (
+                    "PUT",
+                    f"zones/{carrier.carrier_id}",
+                    {"latitude": carrier.latitude, "longitude": carrier.longitude},
+                )
+                for carrier in carriers
+            )
+
+        def batch():
+            client.assign_zones(carriers)
+
+        modes: List[Callable[[], None]] = [
+            new_connection_per_carrier,
+            pooled_sequential,
+            pooled_concurrent,
+            batch,
+        ]
+        print(f"{'mode':>28} {'carriers/s':>12} {'connections':>12}")
+        for mode in modes:
+            connections_before: int = zone_api.connections
+            started_at: float = time.perf_counter()
+            mode()
+            elapsed: float = time.perf_counter() - started_at
+            print(
+                f"{mode.__name__:>28} {number_of_carriers / elapsed:>12.0f}"
+                f" {zone_api.connections - connections_before:>12}"
+            )
+        client.close()
+
+
+def benchmark_spatial_queries(size: int = 1_000_000, number_of_queries: int = 1000):
+    """
+    Measures nearest-carrier and bounding box queries over
+    carriers spread across a country-sized area.
+    """
+    index = GeoGridIndex()
+    positions = [
+        (str(i), random.uniform(40.0, 60.0), random.uniform(0.0, 30.0))
+        for i in range(size)
+    ]
+    for key, latitude, longitude in positions:
+        index.insert(key, latitude, longitude)
+    points = [
+        (random.uniform(40.0, 60.0), random.uniform(0.0, 30.0))
+        for _ in range(number_of_queries)
+    ]
+
+    started_at: float = time.perf_counter()
+    for latitude, longitude in points:
+        index.nearest(latitude, longitude, k=10)
+    nearest_time: float = (time.perf_counter() - started_at) / number_of_queries
+
+    started_at = time.perf_counter()
+    for latitude, longitude in points:
+        index.within_box(latitude, longitude, latitude + 0.1, longitude + 0.1)
+    box_time: float = (time.perf_counter() - started_at) / number_of_queries
+
+    started_at = time.perf_counter()
+    for latitude, longitude in points[:10]:
+        [
+            key
+            for key, point_latitude, point_longitude in positions
+            if latitude <= point_latitude <= latitude + 0.1
+            and longitude <= point_longitude <= longitude + 0.1
+        ]
+    scan_time: float = (time.perf_counter() - started_at) / 10
+
+    print(
+        f"{size} carriers: 10-nearest {nearest_time * 1000:.3f} ms, "
+        f"box {box_time * 1000:.3f} ms, full scan box {scan_time * 1000:.1f} ms"
+    )
+
+
+def benchmark_carrier_store(size: int = 1_000_000):
+    """
+    Compares the memory used per carrier by Carrier objects with
+    their DB dicts and by the columnar store, and the box scan time.
+    """
+    names: List[str] = ["John", "Jane", "Aleksei", "Maria", "Ivan"]
+    surnames: List[str] = ["Doe", "Smith", "Ivanov", "Petrova"]
+    rows = [
+        (
+            random.choice(names),
+            random.choice(surnames),
+            random.uniform(40.0, 60.0),
+            random.uniform(0.0, 30.0),
+        )
+        for _ in range(size)
+    ]
+
+    tracemalloc.start()
+    carriers = [Carrier(*row) for row in rows]
+    records = {carrier.carrier_id: carrier._to_db_dict() for carrier in carriers}
+    objects_bytes: int = tracemalloc.get_traced_memory()[0]
+    del carriers, records
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    store = CarrierStore()
+    for row in rows:
+        store.add(*row)
+    store_bytes: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    started_at: float = time.perf_counter()
+    inside: List[str] = store.within_box(45.0, 5.0, 46.0, 6.0)
+    scan_time: float = time.perf_counter() - started_at
+
+    print(
+        f"{size} carriers: objects + dicts {objects_bytes / size:.0f} B/carrier, "
+        f"columnar store {store_bytes / size:.0f} B/carrier "
+        f"(estimate {store.memory_usage() / size:.0f} B/carrier)"
+    )
+    print(
+        f"box scan over {size} rows: {scan_time * 1000:.1f} ms,"
+        f" {len(inside)} carriers found"
+    )
+
+
+def benchmark_journal(number_of_threads: int = 8, transactions_per_thread: int = 200):
+    """
+    Measures transactions per second of concurrent transactions
+    without a journal, with an fsync per record and with group commit.
+    """
+
+    def run(journal: Optional[TransactionJournal]) -> float:
+        def worker():
+            for _ in range(transactions_per_thread):
+                transaction = Transaction(coalesce_writes=False, journal=journal)
+                transaction.register_command(
+                    SaveCarrierCommand(Carrier("John", "Doe", 1.0, 2.0))
+                )
+                transaction.register_command(
+                    SaveCarrierCommand(Carrier("Jane", "Doe", 3.0, 4.0))
+                )
+                transaction.execute()
+
+        threads = [threading.Thread(target=worker) for _ in range(number_of_threads)]
+        started_at: float = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return (
+            number_of_threads
+            * transactions_per_thread
+            / (time.perf_counter() - started_at)
+        )
+
+    number_of_transactions: int = number_of_threads * transactions_per_thread
+    print(f"{'journal':>16} {'tx/s':>10} {'fsyncs/tx':>10}")
+    print(f"{'none':>16} {run(None):>10.0f} {0:>10.2f}")
+    with tempfile.TemporaryDirectory() as directory:
+        for group_commit in (False, True):
+            journal = TransactionJournal(
+                os.path.join(directory, f"journal-{group_commit}.log"), group_commit
+            )
+            transactions_per_second: float = run(journal)
+            journal.close()
+            mode: str = "group commit" if group_commit else "fsync per record"
+            print(
+                f"{mode:>16} {transactions_per_second:>10.0f}"
+                f" {journal.fsyncs / number_of_transactions:>10.2f}"
+            )
+    DB.clear()
+
+
+if __name__ == "__main__":
+    benchmark_save_coalescing()
+    benchmark_zone_assignment()
+    benchmark_spatial_queries()
+    benchmark_carrier_store()
+    benchmark_journal()
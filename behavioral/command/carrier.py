@@ -1,6 +1,10 @@
 import uuid
+from typing import Iterable, List, Tuple
+
+from behavioral.command.spatial_index import GeoGridIndex
 
 DB = {}  # this dict represents a test DB
+DB_LOCATION_INDEX = GeoGridIndex()  # kept up to date on save and delete
 
 
 class Carrier:
@@ -17,9 +21,66 @@ class Carrier:
 
     def save_to_db(self):
         DB[self.carrier_id] = self._to_db_dict()
+        DB_LOCATION_INDEX.insert(self.carrier_id, self.latitude, self.longitude)
 
     def delete(self):
         DB.pop(self.carrier_id)
+        DB_LOCATION_INDEX.remove(self.carrier_id)
+
+    @classmethod
+    def save_many(cls, carriers: Iterable["Carrier"]):
+        """
+        Upserts many carriers with a single write.
+        """
+        carriers = list(carriers)
+        DB.update({carrier.carrier_id: carrier._to_db_dict() for carrier in carriers})
+        for carrier in carriers:
+            DB_LOCATION_INDEX.insert(
+                carrier.carrier_id, carrier.latitude, carrier.longitude
+            )
+
+    @classmethod
+    def delete_many(cls, carriers: Iterable["Carrier"]):
+        cls.delete_by_ids(carrier.carrier_id for carrier in carriers)
+
+    @classmethod
+    def delete_by_ids(cls, carrier_ids: Iterable[str]):
+        for carrier_id in carrier_ids:
+            DB.pop(carrier_id, None)
+            DB_LOCATION_INDEX.remove(carrier_id)
+
+    @classmethod
+    def find_nearest(
+        cls, latitude: float, longitude: float, k: int = 1
+    ) -> List[Tuple[dict, float]]:
+        """
+        Returns up to k carrier records closest to the point
+        together with their distance in kilometers.
+        """
+        return [
+            (DB[carrier_id], distance)
+            for carrier_id, distance in DB_LOCATION_INDEX.nearest(
+                latitude, longitude, k
+            )
+        ]
+
+    @classmethod
+    def find_in_box(
+        cls,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> List[dict]:
+        """
+        Returns the records of all carriers inside the box.
+        """
+        return [
+            DB[carrier_id]
+            for carrier_id in DB_LOCATION_INDEX.within_box(
+                min_latitude, min_longitude, max_latitude, max_longitude
+            )
+        ]
 
     def _to_db_dict(self) -> dict:
         return {
@@ -0,0 +1,178 @@
+import sys
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class CarrierView:
+    """
+    A lightweight carrier which does not hold its data
+    but reads and writes a row of the CarrierStore.
+    """
+
+    __slots__ = ("_store", "carrier_id")
+
+    def __init__(self, store: "CarrierStore", carrier_id: str):
+        self._store = store
+        self.carrier_id = carrier_id
+
+    @property
+    def name(self) -> str:
+        return self._store._names[self._store._rows[self.carrier_id]]
+
+    @property
+    def surname(self) -> str:
+        return self._store._surnames[self._store._rows[self.carrier_id]]
+
+    @property
+    def latitude(self) -> float:
+        return float(self._store._latitudes[self._store._rows[self.carrier_id]])
+
+    @latitude.setter
+    def latitude(self, value: float):
+        self._store._latitudes[self._store._rows[self.carrier_id]] = value
+
+    @property
+    def longitude(self) -> float:
+        return float(self._store._longitudes[self._store._rows[self.carrier_id]])
+
+    @longitude.setter
+    def longitude(self, value: float):
+        self._store._longitudes[self._store._rows[self.carrier_id]] = value
+
+
+class CarrierStore:
+    """
+    A columnar store of carriers.
+    Coordinates are kept in NumPy arrays which grow by doubling,
+    names are interned so that carriers with the same name share one string,
+    and carrier_id is mapped to a row index.
+    Deleting a carrier moves the last row into its place.
+    The store is separate from DB and DB_LOCATION_INDEX, which keep a dict
+    and a Carrier per carrier: carriers are moved into it explicitly,
+    with add_carriers or SaveCarriersToStoreCommand.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._surnames: List[str] = []
+        self._latitudes = np.empty(capacity)
+        self._longitudes = np.empty(capacity)
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, carrier_id: str) -> bool:
+        return carrier_id in self._rows
+
+    def add(
+        self,
+        name: str,
+        surname: str,
+        latitude: float,
+        longitude: float,
+        carrier_id: Optional[str] = None,
+    ) -> CarrierView:
+        """
+        Adds a carrier or overwrites it if the carrier_id already exists.
+        """
+        carrier_id = carrier_id or str(uuid.uuid4())
+        row: Optional[int] = self._rows.get(carrier_id)
+        if row is not None:
+            self._names[row] = sys.intern(name)
+            self._surnames[row] = sys.intern(surname)
+            self._latitudes[row] = latitude
+            self._longitudes[row] = longitude
+            return CarrierView(self, carrier_id)
+
+        row = len(self._ids)
+        self._reserve(row + 1)
+        self._rows[carrier_id] = row
+        self._ids.append(carrier_id)
+        self._names.append(sys.intern(name))
+        self._surnames.append(sys.intern(surname))
+        self._latitudes[row] = latitude
+        self._longitudes[row] = longitude
+        return CarrierView(self, carrier_id)
+
+    def add_carriers(self, carriers: Iterable) -> List[CarrierView]:
+        """
+        Adds Carrier objects keeping their ids.
+        """
+        return [
+            self.add(
+                carrier.name,
+                carrier.surname,
+                carrier.latitude,
+                carrier.longitude,
+                carrier.carrier_id,
+            )
+            for carrier in carriers
+        ]
+
+    def get(self, carrier_id: str) -> CarrierView:
+        if carrier_id not in self._rows:
+            raise KeyError(carrier_id)
+        return CarrierView(self, carrier_id)
+
+    def delete(self, carrier_id: str):
+        row: int = self._rows.pop(carrier_id)
+        last_id: str = self._ids.pop()
+        last_name: str = self._names.pop()
+        last_surname: str = self._surnames.pop()
+        last_row: int = len(self._ids)
+        if row == last_row:
+            return
+        self._ids[row] = last_id
+        self._names[row] = last_name
+        self._surnames[row] = last_surname
+        self._latitudes[row] = self._latitudes[last_row]
+        self._longitudes[row] = self._longitudes[last_row]
+        self._rows[last_id] = row
+
+    def within_box(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> List[str]:
+        """
+        Returns the ids of all carriers inside the box
+        by a vectorized scan of the coordinate columns.
+        """
+        size: int = len(self._ids)
+        latitudes: np.ndarray = self._latitudes[:size]
+        longitudes: np.ndarray = self._longitudes[:size]
+        inside: np.ndarray = (
+            (latitudes >= min_latitude)
+            & (latitudes <= max_latitude)
+            & (longitudes >= min_longitude)
+            & (longitudes <= max_longitude)
+        )
+        return [self._ids[row] for row in np.flatnonzero(inside)]
+
+    def memory_usage(self) -> int:
+        """
+        Returns an estimate of the bytes used by the store.
+        Interned names are counted once.
+        """
+        strings: int = sum(sys.getsizeof(carrier_id) for carrier_id in self._ids)
+        strings += sum(
+            sys.getsizeof(name) for name in set(self._names) | set(self._surnames)
+        )
+        columns: int = sum(
+            sys.getsizeof(column) for column in (self._ids, self._names, self._surnames)
+        )
+        columns += self._latitudes.nbytes + self._longitudes.nbytes
+        return strings + columns + sys.getsizeof(self._rows)
+
+    def _reserve(self, size: int):
+        if size <= len(self._latitudes):
+            return
+        capacity: int = max(size, 2 * len(self._latitudes))
+        self._latitudes = np.resize(self._latitudes, capacity)
+        self._longitudes = np.resize(self._longitudes, capacity)
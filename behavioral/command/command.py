@@ -1,8 +1,19 @@
-import os
+import uuid
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from behavioral.command.carrier import Carrier
+from behavioral.command.carrier_store import CarrierStore
+from behavioral.journal import (
+    BEGIN,
+    COMMIT,
+    ROLLBACK,
+    UNDO,
+    JournalError,
+    TransactionJournal,
+)
+from behavioral.command.zone_api_client import ZoneApiClient
 
 
 class CommandInterface(ABC):
@@ -23,6 +34,14 @@ class CommandInterface(ABC):
         Rolls the command result back.
         """
 
+    def undo_record(self) -> Optional[Tuple[str, dict]]:
+        """
+        Returns the name and arguments of an undo action
+        which can be journaled and applied after a crash,
+        or None if the command can't be undone this way.
+        """
+        return None
+
 
 class BaseCarrierCommand(CommandInterface, ABC):
     """
@@ -32,6 +51,10 @@ class BaseCarrierCommand(CommandInterface, ABC):
     def __init__(self, carrier: Carrier):
         self._carrier = carrier
 
+    @property
+    def carrier(self) -> Carrier:
+        return self._carrier
+
 
 class SaveCarrierCommand(BaseCarrierCommand):
     """
@@ -45,15 +68,58 @@ class SaveCarrierCommand(BaseCarrierCommand):
     def undo(self):
         self._carrier.delete()
 
+    def undo_record(self) -> Optional[Tuple[str, dict]]:
+        return "delete_carriers", {"carrier_ids": [self._carrier.carrier_id]}
+
+
+class BulkSaveCarrierCommand(CommandInterface):
+    """
+    Creates many carrier records with one bulk upsert
+    and deletes them with one bulk delete on undo.
+    """
+
+    def __init__(self, carriers: List[Carrier]):
+        self._carriers = carriers
+
+    def execute(self):
+        Carrier.save_many(self._carriers)
+
+    def undo(self):
+        Carrier.delete_many(self._carriers)
+
+    def undo_record(self) -> Optional[Tuple[str, dict]]:
+        return "delete_carriers", {
+            "carrier_ids": [carrier.carrier_id for carrier in self._carriers]
+        }
+
+
+class SaveCarriersToStoreCommand(CommandInterface):
+    """
+    Adds many carriers to a columnar carrier store instead of the DB
+    and deletes them on undo.
+    """
+
+    def __init__(self, store: CarrierStore, carriers: List[Carrier]):
+        self._store = store
+        self._carriers = carriers
+
+    def execute(self):
+        self._store.add_carriers(self._carriers)
+
+    def undo(self):
+        for carrier in self._carriers:
+            if carrier.carrier_id in self._store:
+                self._store.delete(carrier.carrier_id)
+
 
 class AssignCarrierToZoneCommand(BaseCarrierCommand):
     """
     Calls the microservice that assigns carriers to geographical zones.
     """
 
-    def __init__(self, carrier: Carrier):
+    def __init__(self, carrier: Carrier, client: Optional[ZoneApiClient] = None):
         super(AssignCarrierToZoneCommand, self).__init__(carrier)
-        self._url: str = os.getenv("GEOGRAPHICAL_API_URL")
+        self._client: ZoneApiClient = client or ZoneApiClient.get_instance()
 
     def execute(self):
         request_body: dict = {
@@ -65,8 +131,47 @@ class AssignCarrierToZoneCommand(BaseCarrierCommand):
     def undo(self):
         self._send("DELETE", uri=f"zones/{self._carrier.carrier_id}")
 
+    def undo_record(self) -> Optional[Tuple[str, dict]]:
+        return "unassign_zones", {"carrier_ids": [self._carrier.carrier_id]}
+
     def _send(self, method: str, uri: str = None, body: dict = None):
-        print(f"Sending {method} request to {self._url}/{uri}. Body={body}")
+        self._client.send(method, uri, body)
+
+
+class BatchAssignCarriersToZoneCommand(CommandInterface):
+    """
+    Assigns many carriers to geographical zones with one call.
+    """
+
+    def __init__(self, carriers: List[Carrier], client: Optional[ZoneApiClient] = None):
+        self._carriers = carriers
+        self._client: ZoneApiClient = client or ZoneApiClient.get_instance()
+
+    def execute(self):
+        self._client.assign_zones(self._carriers)
+
+    def undo(self):
+        self._client.unassign_zones(self._carriers)
+
+    def undo_record(self) -> Optional[Tuple[str, dict]]:
+        return "unassign_zones", {
+            "carrier_ids": [carrier.carrier_id for carrier in self._carriers]
+        }
+
+
+def _unassign_zones(arguments: dict):
+    ZoneApiClient.get_instance().send(
+        "DELETE", "zones", {"carrier_ids": arguments["carrier_ids"]}
+    )
+
+
+# undo actions which can be applied by TransactionJournal.recover after a crash
+UNDO_ACTIONS: Dict[str, Callable[[dict], None]] = {
+    "delete_carriers": lambda arguments: Carrier.delete_by_ids(
+        arguments["carrier_ids"]
+    ),
+    "unassign_zones": _unassign_zones,
+}
 
 
 class Transaction:
@@ -74,11 +179,18 @@ class Transaction:
     The class is an invoker of registered commands
     which wraps their execution into a transaction:
     if any of the commands fail -> all executed commands are rolled back.
+    If a journal is given, the undo record of every command is made
+    durable before the command is executed.
     """
 
-    def __init__(self):
+    def __init__(
+        self, coalesce_writes: bool = True, journal: Optional[TransactionJournal] = None
+    ):
         self._commands_to_execute: List[CommandInterface] = []
         self._executed_commands: List[CommandInterface] = []
+        self._coalesce_writes = coalesce_writes
+        self._journal = journal
+        self._transaction_id: str = str(uuid.uuid4())
 
     def register_command(self, command: CommandInterface):
         self._commands_to_execute.append(command)
@@ -88,17 +200,37 @@ class Transaction:
         Executes all commands one after another.
         if any of the commands fail -> all executed commands are rolled back.
         """
-        for command in self._commands_to_execute:
+        commands: List[CommandInterface] = self._commands_to_execute
+        if self._coalesce_writes:
+            commands = self._coalesce_save_commands(commands)
+
+        self._write_to_journal({"type": BEGIN}, durable=False)
+        for command in commands:
             try:
+                self._journal_undo_record(command)
                 # execute the command
                 command.execute()
             except Exception as e:
                 # if any exception occurs -> rollback all previously executed commands
                 print(f"Error occurred while executing a command: {e}")
                 self._rollback()
+                self._finish_in_journal(ROLLBACK)
                 break
 
             self._executed_commands.append(command)
+        else:
+            self._commit()
+
+    def _commit(self):
+        """
+        Makes the commit durable. If the journal can't be written,
+        the transaction is rolled back, as recovery would roll it back too.
+        """
+        try:
+            self._write_to_journal({"type": COMMIT})
+        except JournalError as e:
+            print(f"Error occurred while committing the transaction: {e}")
+            self._rollback()
 
     def _rollback(self):
         """
@@ -107,19 +239,205 @@ class Transaction:
         for command in self._executed_commands:
             command.undo()
 
+    def _journal_undo_record(self, command: CommandInterface):
+        undo_record: Optional[Tuple[str, dict]] = command.undo_record()
+        if undo_record is not None:
+            action, arguments = undo_record
+            self._write_to_journal(
+                {"type": UNDO, "action": action, "arguments": arguments}
+            )
+
+    def _finish_in_journal(self, record_type: str):
+        """
+        Writes the outcome of a rolled back transaction.
+        A journal which can't be written must not hide the original error:
+        without the record, recovery applies the undo records once more,
+        which restores the same state.
+        """
+        try:
+            self._write_to_journal({"type": record_type})
+        except JournalError as e:
+            print(f"Error occurred while writing to the journal: {e}")
+
+    def _write_to_journal(self, record: dict, durable: bool = True):
+        if self._journal is not None:
+            record["transaction_id"] = self._transaction_id
+            self._journal.append(record, durable=durable)
+
+    @staticmethod
+    def _coalesce_save_commands(
+        commands: List[CommandInterface],
+    ) -> List[CommandInterface]:
+        """
+        Replaces every run of consecutive SaveCarrierCommands
+        with a single BulkSaveCarrierCommand.
+        """
+        coalesced: List[CommandInterface] = []
+        carriers_to_save: List[Carrier] = []
+        for command in commands:
+            if type(command) is SaveCarrierCommand:
+                carriers_to_save.append(command.carrier)
+                continue
+            if carriers_to_save:
+                coalesced.append(BulkSaveCarrierCommand(carriers_to_save))
+                carriers_to_save = []
+            coalesced.append(command)
+        if carriers_to_save:
+            coalesced.append(BulkSaveCarrierCommand(carriers_to_save))
+        return coalesced
+
+
+class ConcurrentTransaction(Transaction):
+    """
+    A transaction which runs commands as a dependency graph:
+    a command starts when all the commands it depends on are done,
+    and independent commands run concurrently on a thread pool.
+    If any of the commands fail -> pending commands are cancelled and
+    executed commands are rolled back in reverse dependency order.
+    If a journal is given, the undo record of every command is made
+    durable before the command is executed, the records of commands
+    running at the same time share an fsync.
+    """
+
+    def __init__(
+        self, max_workers: int = 8, journal: Optional[TransactionJournal] = None
+    ):
+        super(ConcurrentTransaction, self).__init__(
+            coalesce_writes=False, journal=journal
+        )
+        self._max_workers = max_workers
+        self._dependencies: Dict[CommandInterface, List[CommandInterface]] = {}
+
+    def register_command(
+        self, command: CommandInterface, depends_on: Iterable[CommandInterface] = ()
+    ):
+        dependencies: List[CommandInterface] = list(depends_on)
+        for dependency in dependencies:
+            if dependency not in self._dependencies:
+                raise ValueError("A command can depend only on registered commands")
+        super(ConcurrentTransaction, self).register_command(command)
+        self._dependencies[command] = dependencies
+
+    def execute(self):
+        """
+        Executes the commands in dependency order.
+        if any of the commands fail -> all executed commands are rolled back.
+        """
+        self._write_to_journal({"type": BEGIN}, durable=False)
+        executed, failed = self._run_graph(
+            self._commands_to_execute,
+            self._dependencies,
+            self._journal_and_execute,
+            stop_on_error=True,
+        )
+        self._executed_commands.extend(executed)
+        if failed:
+            self._rollback()
+            self._finish_in_journal(ROLLBACK)
+        else:
+            self._commit()
+
+    def _journal_and_execute(self, command: CommandInterface):
+        self._journal_undo_record(command)
+        command.execute()
+
+    def _rollback(self):
+        """
+        Rolls back executed commands: a command is undone
+        after all executed commands that depend on it are undone.
+        """
+        executed: Set[CommandInterface] = set(self._executed_commands)
+        # in reverse order, the dependents of a command become its dependencies
+        undo_dependencies: Dict[CommandInterface, List[CommandInterface]] = {
+            command: [] for command in self._executed_commands
+        }
+        for command in self._executed_commands:
+            for dependency in self._dependencies[command]:
+                if dependency in executed:
+                    undo_dependencies[dependency].append(command)
+
+        self._run_graph(
+            self._executed_commands,
+            undo_dependencies,
+            lambda command: command.undo(),
+            stop_on_error=False,
+        )
+        self._executed_commands.clear()
+
+    def _run_graph(
+        self,
+        commands: List[CommandInterface],
+        dependencies: Dict[CommandInterface, List[CommandInterface]],
+        action: Callable[[CommandInterface], None],
+        stop_on_error: bool,
+    ) -> Tuple[List[CommandInterface], bool]:
+        """
+        Runs the action for every command once the actions
+        for all its dependencies are done.
+        Returns the commands for which the action succeeded
+        and a flag which shows whether any of the actions failed.
+        """
+        dependents: Dict[CommandInterface, List[CommandInterface]] = {
+            command: [] for command in commands
+        }
+        waiting_for: Dict[CommandInterface, int] = {}
+        for command in commands:
+            waiting_for[command] = len(dependencies[command])
+            for dependency in dependencies[command]:
+                dependents[dependency].append(command)
+
+        succeeded: List[CommandInterface] = []
+        failed: bool = False
+        running: Dict[Future, CommandInterface] = {}
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for command, count in waiting_for.items():
+                if not count:
+                    running[executor.submit(action, command)] = command
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    command = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        succeeded.append(command)
+                    else:
+                        print(f"Error occurred while running a command: {error}")
+                        failed = True
+
+                    if failed and stop_on_error:
+                        # pending commands are never started, running ones finish
+                        continue
+                    for dependent in dependents[command]:
+                        waiting_for[dependent] -= 1
+                        if not waiting_for[dependent]:
+                            running[executor.submit(action, dependent)] = dependent
+        return succeeded, failed
+
 
 if __name__ == "__main__":
-    # create a carrier object
-    new_carrier = Carrier("John", "Doe", 12.32, 54.21)
+    from behavioral.command.zone_api_stub import ZoneApiStubServer
+
+    # a local stand-in of the zones microservice
+    with ZoneApiStubServer() as zone_api:
+        zone_api_client = ZoneApiClient(zone_api.url)
+
+        # create a carrier object
+        new_carrier = Carrier("John", "Doe", 12.32, 54.21)
 
-    # create commands
-    save_carrier_command = SaveCarrierCommand(new_carrier)
-    assign_carrier_to_zone_command = AssignCarrierToZoneCommand(new_carrier)
+        # create commands
+        save_carrier_command = SaveCarrierCommand(new_carrier)
+        assign_carrier_to_zone_command = AssignCarrierToZoneCommand(
+            new_carrier, zone_api_client
+        )
 
-    # create a transaction
-    transaction = Transaction()
-    transaction.register_command(save_carrier_command)
-    transaction.register_command(assign_carrier_to_zone_command)
+        # create a transaction
+        transaction = Transaction()
+        transaction.register_command(save_carrier_command)
+        transaction.register_command(assign_carrier_to_zone_command)
 
-    # execute the transaction
-    transaction.execute()
+        # execute the transaction
+        transaction.execute()
+        print(f"Assigned zones: {zone_api.zones}")
+        zone_api_client.close()
@@ -0,0 +1,205 @@
+import math
+from typing import Dict, Iterator, List, Tuple
+
+EARTH_RADIUS_KM: float = 6371.0
+
+Position = Tuple[float, float]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Returns the great-circle distance between two points in kilometers.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi: float = phi2 - phi1
+    d_lambda: float = math.radians(lon2 - lon1)
+    a: float = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGridIndex:
+    """
+    A spatial index which splits the globe into a grid of
+    cells of cell_size degrees and keeps the points of each cell.
+    Supports moving and removing points, k-nearest and bounding box queries.
+    """
+
+    def __init__(self, cell_size: float = 0.05):
+        self._cell_size = cell_size
+        self._rows: int = math.ceil(180 / cell_size)
+        self._columns: int = math.ceil(360 / cell_size)
+        self._cells: Dict[Tuple[int, int], Dict[str, Position]] = {}
+        self._positions: Dict[str, Position] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def insert(self, key: str, latitude: float, longitude: float):
+        """
+        Adds a point or moves it if the key is already indexed.
+        """
+        if key in self._positions:
+            self.remove(key)
+        position: Position = (latitude, longitude)
+        self._positions[key] = position
+        self._cells.setdefault(self._cell_of(latitude, longitude), {})[key] = position
+
+    def remove(self, key: str):
+        position: Position = self._positions.pop(key, None)
+        if position is None:
+            return
+        cell: Tuple[int, int] = self._cell_of(*position)
+        points: Dict[str, Position] = self._cells[cell]
+        del points[key]
+        if not points:
+            del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._positions.clear()
+
+    def within_box(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> List[str]:
+        """
+        Returns the keys of all points inside the box.
+        """
+        min_row, _ = self._cell_of(min_latitude, min_longitude)
+        max_row, _ = self._cell_of(max_latitude, max_longitude)
+        # the box does not wrap around the antimeridian
+        min_column: int = max(0, int((min_longitude + 180) / self._cell_size))
+        max_column: int = min(
+            self._columns - 1, int((max_longitude + 180) / self._cell_size)
+        )
+        if (max_row - min_row + 1) * (max_column - min_column + 1) > len(self._cells):
+            # sparse data: it is cheaper to scan the non-empty cells
+            cells = [
+                points
+                for (row, column), points in self._cells.items()
+                if min_row <= row <= max_row and min_column <= column <= max_column
+            ]
+        else:
+            cells = [
+                self._cells.get((row, column))
+                for row in range(min_row, max_row + 1)
+                for column in range(min_column, max_column + 1)
+            ]
+
+        keys: List[str] = []
+        for points in cells:
+            if points:
+                for key, (latitude, longitude) in points.items():
+                    if (
+                        min_latitude <= latitude <= max_latitude
+                        and min_longitude <= longitude <= max_longitude
+                    ):
+                        keys.append(key)
+        return keys
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int = 1
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to k (key, distance in km) pairs closest to the point.
+        Cells are visited ring by ring around the point until
+        no unvisited cell can contain a closer point.
+        """
+        if k <= 0 or not self._positions:
+            return []
+        center_row, center_column = self._cell_of(latitude, longitude)
+        found: List[Tuple[float, str]] = []
+        visited_cells = set()
+        seen_points: int = 0
+        max_radius: int = max(self._rows, self._columns // 2 + 1)
+
+        for radius in range(max_radius + 1):
+            if (2 * radius + 1) ** 2 > len(self._cells):
+                # sparse data: it is cheaper to scan the remaining non-empty cells
+                cells = [cell for cell in self._cells if cell not in visited_cells]
+            else:
+                cells = self._ring(center_row, center_column, radius)
+            for cell in cells:
+                points: Dict[str, Position] = self._cells.get(cell)
+                if not points or cell in visited_cells:
+                    continue
+                visited_cells.add(cell)
+                seen_points += len(points)
+                for key, (point_latitude, point_longitude) in points.items():
+                    found.append(
+                        (
+                            haversine_km(
+                                latitude, longitude, point_latitude, point_longitude
+                            ),
+                            key,
+                        )
+                    )
+            if len(found) >= k:
+                # the bound check below needs the k-th smallest distance last
+                found.sort()
+                del found[k:]
+            if seen_points == len(self._positions):
+                break
+            if len(found) == k and found[-1][0] <= self._min_distance_outside(
+                latitude, radius
+            ):
+                break
+
+        found.sort()
+        return [(key, distance) for distance, key in found]
+
+    def _cell_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row: int = min(int((latitude + 90) / self._cell_size), self._rows - 1)
+        column: int = int(((longitude + 180) % 360) / self._cell_size) % self._columns
+        return row, column
+
+    def _ring(
+        self, center_row: int, center_column: int, radius: int
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the cells which are exactly radius cells away from the center.
+        Columns wrap around the antimeridian, rows are clamped at the poles.
+        """
+        columns = range(center_column - radius, center_column + radius + 1)
+        if len(columns) > self._columns:
+            columns = range(self._columns)
+        seen_columns = {column % self._columns for column in columns}
+        for row in range(center_row - radius, center_row + radius + 1):
+            if not 0 <= row < self._rows:
+                continue
+            if abs(row - center_row) == radius:
+                for column in seen_columns:
+                    yield row, column
+            else:
+                for column in {
+                    (center_column - radius) % self._columns,
+                    (center_column + radius) % self._columns,
+                }:
+                    yield row, column
+
+    def _min_distance_outside(self, latitude: float, radius: int) -> float:
+        """
+        Returns a lower bound of the distance from the point
+        to any cell which is farther than radius cells away.
+        """
+        degrees: float = radius * self._cell_size
+        latitude_bound: float = math.radians(degrees) * EARTH_RADIUS_KM
+        farthest_latitude: float = min(90.0, abs(latitude) + degrees + self._cell_size)
+        longitude_bound: float = (
+            2
+            * EARTH_RADIUS_KM
+            * math.asin(
+                math.cos(math.radians(farthest_latitude))
+                * math.sin(math.radians(min(degrees, 180.0)) / 2)
+            )
+        )
+        return min(latitude_bound, longitude_bound)
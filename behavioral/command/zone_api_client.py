@@ -0,0 +1,106 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterable, List, Optional, Tuple
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from behavioral.command.carrier import Carrier
+
+# method, uri and an optional JSON body
+ZoneApiCall = Tuple[str, str, Optional[dict]]
+
+
+class ZoneApiClient:
+    """
+    A client of the microservice that assigns carriers to geographical zones.
+    All calls share one session with a pool of keep-alive connections,
+    failed calls are retried with exponential backoff.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_connections: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.1,
+        timeout: float = 5.0,
+    ):
+        self._base_url: str = (
+            base_url or os.getenv("GEOGRAPHICAL_API_URL") or ""
+        ).rstrip("/")
+        self._timeout = timeout
+        # created here, as commands may call send_many from many threads;
+        # the pool starts its threads only on the first call
+        self._executor = ThreadPoolExecutor(max_workers=max_connections)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=None,  # zone assignments are idempotent
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_connections, max_retries=retry
+        )
+        self._session = requests.Session()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    @classmethod
+    def get_instance(cls) -> "ZoneApiClient":
+        """
+        Returns the client shared by all commands.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def send(self, method: str, uri: str, body: Optional[dict] = None) -> Response:
+        response: Response = self._session.request(
+            method, f"{self._base_url}/{uri}", json=body, timeout=self._timeout
+        )
+        response.raise_for_status()
+        return response
+
+    def send_many(self, calls: Iterable[ZoneApiCall]) -> List[Response]:
+        """
+        Sends the calls concurrently, at most max_connections at a time.
+        Waits for all calls to finish, then raises the error
+        of the first failed call in the given order.
+        """
+        futures = [self._executor.submit(self.send, *call) for call in calls]
+        wait(futures)
+        return [future.result() for future in futures]
+
+    def assign_zones(self, carriers: List[Carrier]) -> Response:
+        """
+        Assigns zones to many carriers in one call.
+        """
+        body: dict = {
+            "assignments": [
+                {
+                    "carrier_id": carrier.carrier_id,
+                    "latitude": carrier.latitude,
+                    "longitude": carrier.longitude,
+                }
+                for carrier in carriers
+            ]
+        }
+        return self.send("PUT", "zones", body)
+
+    def unassign_zones(self, carriers: List[Carrier]) -> Response:
+        body: dict = {"carrier_ids": [carrier.carrier_id for carrier in carriers]}
+        return self.send("DELETE", "zones", body)
+
+    def close(self):
+        self._executor.shutdown()
+        self._session.close()
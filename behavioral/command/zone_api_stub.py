@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class _ZoneApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of the zones microservice stand-in.
+    """
+
+    protocol_version = "HTTP/1.1"  # keeps connections alive
+    disable_nagle_algorithm = True
+    server: "_ZoneApiHTTPServer"
+
+    def setup(self):
+        super(_ZoneApiRequestHandler, self).setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_PUT(self):
+        body: Optional[dict] = self._read_body()
+        if self._should_fail():
+            return
+        if self.path == "/zones":
+            for assignment in body["assignments"]:
+                self.server.zones[assignment["carrier_id"]] = assignment
+        else:
+            self.server.zones[self._carrier_id()] = body
+        self._respond(200, {"status": "assigned"})
+
+    def do_DELETE(self):
+        body: Optional[dict] = self._read_body()
+        if self._should_fail():
+            return
+        if self.path == "/zones":
+            for carrier_id in body["carrier_ids"]:
+                self.server.zones.pop(carrier_id, None)
+        else:
+            self.server.zones.pop(self._carrier_id(), None)
+        self._respond(200, {"status": "unassigned"})
+
+    def log_message(self, format, *args):
+        pass
+
+    def _carrier_id(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    def _read_body(self) -> Optional[dict]:
+        length: int = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _should_fail(self) -> bool:
+        with self.server.lock:
+            self.server.requests += 1
+            fail: bool = self.server.failures_to_inject > 0
+            if fail:
+                self.server.failures_to_inject -= 1
+        if fail:
+            self._respond(503, {"status": "unavailable"})
+        elif self.server.latency:
+            time.sleep(self.server.latency)
+        return fail
+
+    def _respond(self, status: int, body: dict):
+        payload: bytes = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _ZoneApiHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, failures_to_inject: int):
+        super(_ZoneApiHTTPServer, self).__init__(
+            ("127.0.0.1", 0), _ZoneApiRequestHandler
+        )
+        self.latency = latency
+        self.failures_to_inject = failures_to_inject
+        self.zones: Dict[str, dict] = {}
+        self.requests: int = 0
+        self.connections: int = 0
+        self.lock = threading.Lock()
+
+
+class ZoneApiStubServer:
+    """
+    A local stand-in for the geographical zones microservice.
+    Runs in a background thread, keeps the assignments in memory
+    and counts requests and connections.
+    Can add latency to every request and answer the first
+    failures_to_inject requests with 503 to exercise retries.
+    """
+
+    def __init__(self, latency: float = 0.0, failures_to_inject: int = 0):
+        self._server = _ZoneApiHTTPServer(latency, failures_to_inject)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def zones(self) -> Dict[str, dict]:
+        return self._server.zones
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    @property
+    def connections(self) -> int:
+        return self._server.connections
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ZoneApiStubServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
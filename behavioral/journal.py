@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+BEGIN: str = "begin"
+UNDO: str = "undo"
+COMMIT: str = "commit"
+ROLLBACK: str = "rollback"
+
+
+class JournalError(Exception):
+    """
+    This exception is raised when the journal can't be written.
+    """
+
+
+class TransactionJournal:
+    """
+    An append-only write-ahead journal of undo records.
+    A transaction writes the undo record of a command before executing it,
+    so that after a crash unfinished transactions can be rolled back.
+
+    Durable appends use group commit: the first waiting thread writes and
+    fsyncs the records of all threads which appended meanwhile,
+    the others just wait for it, so one fsync serves many transactions.
+    """
+
+    def __init__(self, path: str, group_commit: bool = True):
+        self._path = path
+        self._group_commit = group_commit
+        self._file = open(path, "ab")
+        self._condition = threading.Condition()
+        self._pending: List[bytes] = []
+        self._appended: int = 0  # number of the last appended record
+        self._durable: int = 0  # number of the last record on disk
+        self._flushing: bool = False
+        self._error: Optional[Exception] = None
+        self.fsyncs: int = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def append(self, record: dict, durable: bool = True):
+        """
+        Appends a record. If durable is True,
+        returns only after the record is on disk.
+        """
+        line: bytes = json.dumps(record).encode("utf-8") + b"\n"
+        with self._condition:
+            self._raise_if_failed()
+            self._pending.append(line)
+            self._appended += 1
+            record_number: int = self._appended
+            if not durable:
+                return
+            if not self._group_commit:
+                try:
+                    self._write(self._take_pending())
+                except OSError as e:
+                    self._error = e
+                    self._raise_if_failed()
+                self._durable = record_number
+                return
+
+            while self._durable < record_number:
+                self._raise_if_failed()
+                if self._flushing:
+                    self._condition.wait()
+                    continue
+                # become the leader: flush everything appended so far
+                self._flushing = True
+                batch: List[bytes] = self._take_pending()
+                last_in_batch: int = self._appended
+                self._condition.release()
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    self._error = e
+                finally:
+                    self._condition.acquire()
+                    self._flushing = False
+                    if self._error is None:
+                        self._durable = last_in_batch
+                    self._condition.notify_all()
+            self._raise_if_failed()
+
+    def recover(self, undo_actions: Dict[str, Callable[[dict], None]]) -> List[str]:
+        """
+        Rolls back the transactions which were neither committed
+        nor rolled back: applies their undo records in reverse order
+        and marks them rolled back.
+        undo_actions maps an undo action name to a function that applies it.
+        Returns the ids of rolled back transactions.
+        """
+        undo_records: Dict[str, List[dict]] = defaultdict(list)
+        unfinished: Dict[str, bool] = {}
+        with open(self._path, "rb") as journal_file:
+            for line in journal_file:
+                try:
+                    record: dict = json.loads(line)
+                except ValueError:
+                    # a torn write at the end of the journal
+                    break
+                transaction_id: str = record["transaction_id"]
+                if record["type"] == BEGIN:
+                    unfinished[transaction_id] = True
+                elif record["type"] == UNDO:
+                    undo_records[transaction_id].append(record)
+                else:
+                    unfinished.pop(transaction_id, None)
+
+        for transaction_id in unfinished:
+            for record in reversed(undo_records[transaction_id]):
+                undo_actions[record["action"]](record["arguments"])
+            self.append(
+                {"transaction_id": transaction_id, "type": ROLLBACK}, durable=False
+            )
+        if unfinished:
+            self.sync()
+        return list(unfinished)
+
+    def sync(self):
+        """
+        Makes all appended records durable.
+        """
+        self.append({"transaction_id": None, "type": "sync"}, durable=True)
+
+    def close(self):
+        with self._condition:
+            if self._pending and self._error is None:
+                self._write(self._take_pending())
+            self._file.close()
+
+    def _take_pending(self) -> List[bytes]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _write(self, batch: List[bytes]):
+        self._file.write(b"".join(batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.fsyncs += 1
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise JournalError(f"The journal can't be written: {self._error}")
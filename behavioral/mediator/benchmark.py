@@ -0,0 +1,67 @@
+"""
+Benchmarks for the parking mediators.
+Run with: python -m behavioral.mediator.benchmark
+"""
+
+import time
+from typing import List
+
+from behavioral.mediator.mediator import (
+    NearestSlotParkingAssistant,
+    ParkingAssistant,
+    ParkingMediatorInterface,
+)
+
+
+def benchmark_parking_assistant(
+    capacities=(10, 1000, 100_000, 10_000_000), operations: int = 100_000
+):
+    """
+    Measures the cost of a get + release pair on a half-full parking.
+    """
+    print(f"{'capacity':>10} {'ns per get + release':>22}")
+    for capacity in capacities:
+        parking_assistant = ParkingAssistant(capacity)
+        for _ in range(capacity // 2):
+            parking_assistant.get_parking_position()
+
+        started_at: float = time.perf_counter()
+        for _ in range(operations):
+            parking_assistant.release_parking_position(
+                parking_assistant.get_parking_position()
+            )
+        elapsed: float = time.perf_counter() - started_at
+        print(f"{capacity:>10} {elapsed / operations * 1e9:>22.0f}")
+
+
+def benchmark_nearest_slot_allocation(levels: int = 10, slots_per_level: int = 10_000):
+    """
+    Compares allocation throughput of nearest-free-slot and random allocation
+    on a multi-level parking: fills it up, then empties it.
+    """
+    capacity: int = levels * slots_per_level
+    mediators: List[ParkingMediatorInterface] = [
+        ParkingAssistant(capacity),
+        NearestSlotParkingAssistant.with_levels(levels, slots_per_level),
+    ]
+    print(f"{'mediator':>28} {'allocations/s':>14} {'releases/s':>12}")
+    for mediator in mediators:
+        started_at: float = time.perf_counter()
+        positions: List[int] = [
+            mediator.get_parking_position() for _ in range(capacity)
+        ]
+        allocation_time: float = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for position in positions:
+            mediator.release_parking_position(position)
+        release_time: float = time.perf_counter() - started_at
+        print(
+            f"{type(mediator).__name__:>28} {capacity / allocation_time:>14.0f}"
+            f" {capacity / release_time:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_parking_assistant()
+    benchmark_nearest_slot_allocation()
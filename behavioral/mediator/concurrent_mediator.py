@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from behavioral.mediator.exceptions import ParkingFullError
+from behavioral.mediator.mediator import ParkingAssistant, ParkingMediatorInterface
+
+
+class ConcurrentParkingAssistant(ParkingMediatorInterface):
+    """
+    A parking assistant that can be shared by many threads and event loops.
+    Wraps another parking mediator and serializes access to it with a lock.
+    Cars that wait for a position are served in FIFO order:
+    when a position is released, the first waiting car gets a position
+    right away instead of competing with the other cars.
+    """
+
+    def __init__(self, parking_mediator: Optional[ParkingMediatorInterface] = None):
+        self._parking_mediator = parking_mediator or ParkingAssistant()
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    def get_parking_position(self) -> int:
+        with self._lock:
+            return self._parking_mediator.get_parking_position()
+
+    async def wait_for_parking_position(self, timeout: Optional[float] = None) -> int:
+        """
+        Returns a parking position, waiting until one is released
+        if the parking is full.
+        Raises ParkingFullError if no position was released within the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # cars which are already waiting must not be overtaken
+            if not self._waiters:
+                try:
+                    return self._parking_mediator.get_parking_position()
+                except ParkingFullError:
+                    pass
+            future: asyncio.Future = loop.create_future()
+            self._waiters.append((loop, future))
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise ParkingFullError(
+                f"No parking position was released within {timeout} seconds"
+            )
+
+    def release_parking_position(self, position: int):
+        with self._lock:
+            # the wrapped mediator validates the position
+            self._parking_mediator.release_parking_position(position)
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if not future.done():
+                    waiter_position: int = self._parking_mediator.get_parking_position()
+                    loop.call_soon_threadsafe(self._hand_over, future, waiter_position)
+                    return
+
+    def _hand_over(self, future: asyncio.Future, position: int):
+        """
+        Gives the position to a waiting car. Runs in the car's event loop.
+        """
+        if future.done():
+            # the car stopped waiting meanwhile, give the position to the next one
+            self.release_parking_position(position)
+            return
+        future.set_result(position)
+
+
+class WaitingCar:
+    """
+    A car that waits in a queue if the parking is full
+    instead of failing.
+    """
+
+    def __init__(self, brand: str, mediator: ConcurrentParkingAssistant):
+        self.brand = brand
+        self._mediator = mediator
+        self._position: Optional[int] = None
+
+    @property
+    def position(self) -> Optional[int]:
+        return self._position
+
+    async def park(self, timeout: Optional[float] = None):
+        self._position = await self._mediator.wait_for_parking_position(timeout)
+        print(f"{self.brand} parking at position {self._position}")
+
+    def leave(self):
+        if self._position is None:
+            return
+        self._mediator.release_parking_position(self._position)
+        print(f"{self.brand} leaving position {self._position}")
+        self._position = None
+
+
+if __name__ == "__main__":
+    # client code
+
+    async def visit(car: WaitingCar, stay: float):
+        await car.park(timeout=1)
+        await asyncio.sleep(stay)
+        car.leave()
+
+    async def main():
+        # three cars and two positions: the third car waits for the first to leave
+        parking_assistant = ConcurrentParkingAssistant(ParkingAssistant(capacity=2))
+        cars = [
+            WaitingCar(brand, parking_assistant) for brand in ("Jeep", "Audi", "BMW")
+        ]
+        await asyncio.gather(*(visit(car, stay=0.1) for car in cars))
+
+    asyncio.run(main())
@@ -0,0 +1,4 @@
+class ParkingFullError(Exception):
+    """
+    This exception should be raised when there are no free parking positions.
+    """
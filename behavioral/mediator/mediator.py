@@ -1,6 +1,10 @@
+import heapq
 import random
 from abc import ABC, abstractmethod
-from typing import List
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from behavioral.mediator.exceptions import ParkingFullError
 
 
 class ParkingMediatorInterface(ABC):
@@ -15,28 +19,136 @@ class ParkingMediatorInterface(ABC):
         Returns a parking position.
         """
 
+    @abstractmethod
+    def release_parking_position(self, position: int):
+        """
+        Makes a parking position free again.
+        """
+
 
 class ParkingAssistant(ParkingMediatorInterface):
     """
     A concrete parking assistant that
     manages the parking slots.
+    Free positions are kept in an array and picked at random,
+    the picked position is swapped with the last one and popped,
+    so both getting and releasing a position take O(1).
     """
 
-    def __init__(self):
+    def __init__(self, capacity: int = 9):
         # Simulates a parking. In reality, a parking can be a separate class.
-        self._free_parking_positions: List[int] = list(range(9))
+        self._free_parking_positions = array("q", range(capacity))
+        # index of every position in the free positions array, -1 if occupied
+        self._free_position_indexes = array("q", range(capacity))
+
+    @property
+    def capacity(self) -> int:
+        return len(self._free_position_indexes)
+
+    @property
+    def free_positions_count(self) -> int:
+        return len(self._free_parking_positions)
 
     def get_parking_position(self) -> int:
         # ensure that free positions are left
         if not self._free_parking_positions:
-            raise Exception("The parking is full")
+            raise ParkingFullError("The parking is full")
 
         # get random parking position and remove it from the list of free positions
-        parking_position: int = random.choice(self._free_parking_positions)
-        self._free_parking_positions.remove(parking_position)
+        index: int = random.randrange(len(self._free_parking_positions))
+        parking_position: int = self._free_parking_positions[index]
+        last_position: int = self._free_parking_positions.pop()
+        if last_position != parking_position:
+            self._free_parking_positions[index] = last_position
+            self._free_position_indexes[last_position] = index
+        self._free_position_indexes[parking_position] = -1
 
         return parking_position
 
+    def release_parking_position(self, position: int):
+        if not 0 <= position < self.capacity:
+            raise ValueError(f"Invalid parking position: {position}")
+        if self._free_position_indexes[position] != -1:
+            raise ValueError(f"Parking position {position} is already free")
+
+        self._free_position_indexes[position] = len(self._free_parking_positions)
+        self._free_parking_positions.append(position)
+
+
+class NearestSlotParkingAssistant(ParkingMediatorInterface):
+    """
+    A parking assistant for multi-level parkings
+    which gives a car the free slot closest to the entrance
+    or to the car's preferred level.
+    Every slot is described by its level and distance from the lifts.
+    Free slots of each level are kept in a heap ordered by distance,
+    so getting and releasing a slot take O(levels + log n).
+    """
+
+    def __init__(
+        self,
+        slots: Sequence[Tuple[int, float]],
+        entrance_level: int = 0,
+        level_change_cost: float = 50.0,
+    ):
+        self._slots: List[Tuple[int, float]] = list(slots)
+        self._entrance_level = entrance_level
+        # the distance a car would rather drive on its level than change the level
+        self._level_change_cost = level_change_cost
+        self._free_slots_by_level: Dict[int, List[Tuple[float, int]]] = {}
+        for position, (level, distance) in enumerate(self._slots):
+            self._free_slots_by_level.setdefault(level, []).append((distance, position))
+        for free_slots in self._free_slots_by_level.values():
+            heapq.heapify(free_slots)
+        self._occupied = bytearray(len(self._slots))
+
+    @classmethod
+    def with_levels(
+        cls, levels: int, slots_per_level: int, slot_width: float = 2.5, **kwargs
+    ) -> "NearestSlotParkingAssistant":
+        """
+        Creates a parking with equal levels where slots
+        go in a row away from the lifts.
+        """
+        slots: List[Tuple[int, float]] = [
+            (level, index * slot_width)
+            for level in range(levels)
+            for index in range(slots_per_level)
+        ]
+        return cls(slots, **kwargs)
+
+    def get_parking_position(self, preferred_level: Optional[int] = None) -> int:
+        target_level: int = (
+            self._entrance_level if preferred_level is None else preferred_level
+        )
+        best_cost: Optional[float] = None
+        best_level: Optional[int] = None
+        for level, free_slots in self._free_slots_by_level.items():
+            if not free_slots:
+                continue
+            cost: float = free_slots[0][0] + self._level_change_cost * abs(
+                level - target_level
+            )
+            if best_cost is None or cost < best_cost:
+                best_cost, best_level = cost, level
+
+        if best_level is None:
+            raise ParkingFullError("The parking is full")
+
+        _, position = heapq.heappop(self._free_slots_by_level[best_level])
+        self._occupied[position] = 1
+        return position
+
+    def release_parking_position(self, position: int):
+        if not 0 <= position < len(self._slots):
+            raise ValueError(f"Invalid parking position: {position}")
+        if not self._occupied[position]:
+            raise ValueError(f"Parking position {position} is already free")
+
+        self._occupied[position] = 0
+        level, distance = self._slots[position]
+        heapq.heappush(self._free_slots_by_level[level], (distance, position))
+
 
 class Car:
     """
@@ -48,11 +160,20 @@ class Car:
     def __init__(self, brand: str, mediator: ParkingMediatorInterface):
         self.brand = brand
         self._mediator = mediator
+        self._position: Optional[int] = None
 
     def park(self):
         position: int = self._mediator.get_parking_position()
+        self._position = position
         print(f"{self.brand} parking at position {position}")
 
+    def leave(self):
+        if self._position is None:
+            return
+        self._mediator.release_parking_position(self._position)
+        print(f"{self.brand} leaving position {self._position}")
+        self._position = None
+
 
 if __name__ == "__main__":
     # client code
@@ -63,3 +184,4 @@ if __name__ == "__main__":
 
     jeep.park()
     audi.park()
+    jeep.leave()
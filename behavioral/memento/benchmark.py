@@ -0,0 +1,117 @@
+"""
+Benchmarks for the memento transactions.
+Run with: python -m behavioral.memento.benchmark
+"""
+
+import random
+import threading
+import time
+import uuid
+from typing import Callable, List
+
+from behavioral.memento.db_models import DB, User
+from behavioral.memento.memento import Transaction, UpdateBalanceCommand
+from behavioral.memento.optimistic import OptimisticTransaction
+
+
+def _create_users(number_of_users: int) -> List[str]:
+    users: List[User] = [
+        User(str(uuid.uuid4()), f"User {i}", "pass", 1_000_000)
+        for i in range(number_of_users)
+    ]
+    for user in users:
+        user.save()
+    return [user.user_id for user in users]
+
+
+def _run_threads(number_of_threads: int, target: Callable[[int], None]) -> float:
+    threads = [
+        threading.Thread(target=target, args=(seed,))
+        for seed in range(number_of_threads)
+    ]
+    started_at: float = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started_at
+
+
+def benchmark_transfers(
+    thread_counts=(1, 2, 4, 8, 16),
+    number_of_users: int = 100,
+    transfers_per_thread: int = 5000,
+):
+    """
+    Measures transfer throughput of optimistic transactions over N threads
+    and compares it with unsynchronized update commands, which can lose updates.
+    """
+    print(
+        f"{'threads':>7} {'optimistic/s':>13} {'conflicts':>10} {'lost':>6}"
+        f" {'unsynchronized/s':>17} {'lost':>8}"
+    )
+    for number_of_threads in thread_counts:
+        user_ids: List[str] = _create_users(number_of_users)
+        total_before: float = sum(DB[user_id]["balance"] for user_id in user_ids)
+        attempts: List[int] = []
+
+        def optimistic_worker(seed: int):
+            generator = random.Random(seed)
+            thread_attempts: int = 0
+            for _ in range(transfers_per_thread):
+                from_user_id, to_user_id = generator.sample(user_ids, 2)
+                amount: int = generator.randint(1, 10)
+
+                def work(transaction: OptimisticTransaction):
+                    nonlocal thread_attempts
+                    thread_attempts += 1
+                    from_balance: float = transaction.read(from_user_id)["balance"]
+                    to_balance: float = transaction.read(to_user_id)["balance"]
+                    transaction.write(from_user_id, balance=from_balance - amount)
+                    transaction.write(to_user_id, balance=to_balance + amount)
+
+                OptimisticTransaction.run(work, max_attempts=10_000)
+            attempts.append(thread_attempts)
+
+        optimistic_time: float = _run_threads(number_of_threads, optimistic_worker)
+        optimistic_lost: float = total_before - sum(
+            DB[user_id]["balance"] for user_id in user_ids
+        )
+        transfers: int = number_of_threads * transfers_per_thread
+        conflicts: int = sum(attempts) - transfers
+
+        user_ids = _create_users(number_of_users)
+        total_before = sum(DB[user_id]["balance"] for user_id in user_ids)
+
+        def unsynchronized_worker(seed: int):
+            generator = random.Random(seed)
+            for _ in range(transfers_per_thread):
+                from_user, to_user = (
+                    User.get(user_id) for user_id in generator.sample(user_ids, 2)
+                )
+                amount: int = generator.randint(1, 10)
+                transaction = Transaction()
+                transaction.register_command(
+                    UpdateBalanceCommand(from_user, from_user.balance - amount)
+                )
+                transaction.register_command(
+                    UpdateBalanceCommand(to_user, to_user.balance + amount)
+                )
+                transaction.execute()
+
+        unsynchronized_time: float = _run_threads(
+            number_of_threads, unsynchronized_worker
+        )
+        unsynchronized_lost: float = total_before - sum(
+            DB[user_id]["balance"] for user_id in user_ids
+        )
+        print(
+            f"{number_of_threads:>7} {transfers / optimistic_time:>13.0f}"
+            f" {conflicts:>10}"
+            f" {optimistic_lost:>6.0f} {transfers / unsynchronized_time:>17.0f}"
+            f" {unsynchronized_lost:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_transfers()
@@ -1,7 +1,13 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import Set
+from typing import Any, Dict, List, Optional, Set, Tuple
+from weakref import WeakValueDictionary
 
 DB = {}
+# records are never changed in place: every write publishes a new record
+# with the next version, so readers need no lock
+VERSION_FIELD: str = "version"
+DB_WRITE_LOCK = threading.RLock()
 
 
 class DBModelInterface(ABC):
@@ -36,12 +42,97 @@ class DBModelInterface(ABC):
         Gets the record from the DB
         """
 
+    @abstractmethod
+    def get_state(self) -> dict:
+        """
+        Returns the fields which can be updated and their values.
+        """
+
+    @abstractmethod
+    def set_state(self, state: dict):
+        """
+        Updates the record with the fields from the state.
+        """
+
+    @abstractmethod
+    def flush(self) -> bool:
+        """
+        Writes the changed fields to the DB.
+        Returns False if there was nothing to write.
+        """
+
+    @abstractmethod
+    def mark_clean(self):
+        """
+        Forgets the changed fields without writing them
+        and takes their values from the DB again.
+        """
+
+
+class UnitOfWork:
+    """
+    Collects the models changed during a transaction
+    and writes each of them once, with the changed fields only, on commit.
+    A model takes part in a unit of work after it is registered
+    until the unit of work is committed or discarded.
+    """
+
+    def __init__(self):
+        # a dict keeps the order in which models were changed
+        self._dirty_models: Dict[DBModelInterface, None] = {}
+        self._models: Dict[DBModelInterface, None] = {}
+        self.updates: int = 0
+        self.writes: int = 0
+
+    @property
+    def writes_saved(self) -> int:
+        return self.updates - self.writes
+
+    def register(self, model: DBModelInterface):
+        model.unit_of_work = self
+        self._models[model] = None
+
+    def mark_dirty(self, model: DBModelInterface):
+        self.updates += 1
+        self._dirty_models[model] = None
+
+    def commit(self):
+        for model in self._dirty_models:
+            if model.flush():
+                self.writes += 1
+        self._dirty_models.clear()
+        self._detach()
+
+    def discard(self):
+        for model in self._dirty_models:
+            model.mark_clean()
+        self._dirty_models.clear()
+        self._detach()
+
+    def _detach(self):
+        """
+        Makes the models write their changes right away again.
+        """
+        for model in self._models:
+            if model.unit_of_work is self:
+                model.unit_of_work = None
+        self._models.clear()
+
 
 class User(DBModelInterface):
     """
-    The class represents a user record
+    The class represents a user record.
+    Loaded users are kept in an identity map, so getting the same user
+    twice returns the same object while it is in use.
+    Fields listed in indexed_fields have secondary indexes
+    which are kept up to date on every write.
     """
 
+    indexed_fields: Tuple[str, ...] = ("username",)
+    _identity_map: "WeakValueDictionary[str, User]" = WeakValueDictionary()
+    # field -> value -> ids of users with this value
+    _indexes: Dict[str, Dict[Any, Set[str]]] = {}
+
     def __init__(self, user_id: str, username: str, password: str, balance: float):
         self.user_id = user_id
         self.username = username
@@ -51,23 +142,133 @@ class User(DBModelInterface):
             "username",
             "balance",
         }
+        self._dirty_fields: Set[str] = set()
+        self.unit_of_work: Optional[UnitOfWork] = None
 
     @property
     def balance(self) -> float:
         return self._balance
 
+    @balance.setter
+    def balance(self, value: float):
+        self._balance = value
+
     def save(self):
-        DB[self.user_id] = self._to_dict()
+        self._identity_map[self.user_id] = self
+        self.write_record(self._to_dict())
+        self._dirty_fields.clear()
 
     def update(self, **kwargs):
+        """
+        Updates the fields and writes them to the DB,
+        or leaves the writing to the unit of work if the model is registered in one.
+        """
         for key, value in kwargs.items():
             if key in self._allowed_to_update:
                 setattr(self, key, value)
-        self.save()
+                self._dirty_fields.add(key)
+        if self.unit_of_work is not None:
+            self.unit_of_work.mark_dirty(self)
+        else:
+            self.flush()
+
+    def flush(self) -> bool:
+        if not self._dirty_fields:
+            return False
+        # the changed fields are merged into the latest version under the lock,
+        # so a write made after this record was read is not lost
+        with DB_WRITE_LOCK:
+            record: Optional[dict] = DB.get(self.user_id)
+            if record is None:
+                self.save()
+                return True
+            record = dict(record)
+            record.update({field: getattr(self, field) for field in self._dirty_fields})
+            self._dirty_fields.clear()
+            self.write_record(record)
+        return True
+
+    def mark_clean(self):
+        with DB_WRITE_LOCK:
+            self._dirty_fields.clear()
+            record: Optional[dict] = DB.get(self.user_id)
+            if record is not None:
+                self._load(record)
 
     @classmethod
-    def get(cls, user_id: str) -> "DBModelInterface":
-        return DB.get(user_id)
+    def get(cls, user_id: str) -> Optional["User"]:
+        user: Optional[User] = cls._identity_map.get(user_id)
+        if user is not None:
+            return user
+        record: Optional[dict] = DB.get(user_id)
+        if record is None:
+            return None
+        user = cls(
+            record["user_id"], record["username"], record["password"], record["balance"]
+        )
+        cls._identity_map[user_id] = user
+        return user
+
+    @classmethod
+    def write_record(cls, record: dict):
+        """
+        Publishes a new version of a record and updates the indexes
+        and the loaded user. Readers holding the previous version are not affected.
+        """
+        user_id: str = record["user_id"]
+        with DB_WRITE_LOCK:
+            old_record: Optional[dict] = DB.get(user_id)
+            record[VERSION_FIELD] = (old_record or {}).get(VERSION_FIELD, 0) + 1
+            cls._reindex(user_id, old_record, record)
+            DB[user_id] = record
+            user: Optional[User] = cls._identity_map.get(user_id)
+            if user is not None:
+                user._load(record)
+
+    @classmethod
+    def find_by(cls, field: str, value: Any) -> List["User"]:
+        """
+        Returns the users with the given value of an indexed field.
+        """
+        if field not in cls.indexed_fields:
+            raise ValueError(f"Field {field} is not indexed")
+        user_ids: Set[str] = cls._indexes.get(field, {}).get(value, set())
+        return [cls.get(user_id) for user_id in list(user_ids)]
+
+    def get_state(self) -> dict:
+        return {field: getattr(self, field) for field in self._allowed_to_update}
+
+    def set_state(self, state: dict):
+        self.update(**state)
+
+    def _load(self, record: dict):
+        """
+        Takes the field values from a record.
+        Changed fields which are not written yet are kept.
+        """
+        if "username" not in self._dirty_fields:
+            self.username = record["username"]
+        if "balance" not in self._dirty_fields:
+            self._balance = record["balance"]
+        self._password = record["password"]
+
+    @classmethod
+    def _reindex(cls, user_id: str, old_record: Optional[dict], changes: dict):
+        """
+        Moves the user between index entries for the changed indexed fields.
+        """
+        for field in cls.indexed_fields:
+            if field not in changes:
+                continue
+            index: Dict[Any, Set[str]] = cls._indexes.setdefault(field, {})
+            if old_record is not None and field in old_record:
+                if old_record[field] == changes[field]:
+                    continue
+                user_ids: Set[str] = index.get(old_record[field], set())
+                user_ids.discard(user_id)
+                if not user_ids:
+                    index.pop(old_record[field], None)
+            index.setdefault(changes[field], set()).add(user_id)
 
     def _to_dict(self) -> dict:
         """
@@ -0,0 +1,165 @@
+import uuid
+from typing import Dict, List, Optional
+
+from behavioral.memento.db_models import DBModelInterface, User
+
+
+class ModelSnapshot:
+    """
+    A snapshot of a model state.
+    Stores only the fields changed since the previous snapshot,
+    unchanged values are shared with the previous snapshots.
+    A keyframe stores the whole state.
+    """
+
+    __slots__ = ("changes", "is_keyframe")
+
+    def __init__(self, changes: dict, is_keyframe: bool):
+        self.changes = changes
+        self.is_keyframe = is_keyframe
+
+
+class ModelHistory:
+    """
+    A bounded history of snapshots of one model.
+    Snapshots are kept in a ring buffer of a fixed capacity,
+    the oldest snapshot is dropped when a new one is pushed to a full history.
+    Every keyframe_interval snapshots a keyframe is stored, so restoring
+    any version applies at most keyframe_interval snapshots.
+    """
+
+    def __init__(
+        self, model: DBModelInterface, capacity: int = 64, keyframe_interval: int = 16
+    ):
+        if capacity <= 0 or keyframe_interval <= 0:
+            raise ValueError("capacity and keyframe_interval must be positive")
+        self._model = model
+        self._capacity = capacity
+        self._keyframe_interval = keyframe_interval
+        self._snapshots: List[Optional[ModelSnapshot]] = [None] * capacity
+        self._next_version: int = 0
+        self._snapshots_since_keyframe: int = 0
+        self._last_state: dict = {}
+
+    @property
+    def oldest_version(self) -> int:
+        return max(0, self._next_version - self._capacity)
+
+    @property
+    def latest_version(self) -> Optional[int]:
+        return self._next_version - 1 if self._next_version else None
+
+    def __len__(self) -> int:
+        return self._next_version - self.oldest_version
+
+    def push(self) -> int:
+        """
+        Takes a snapshot of the model and returns its version.
+        """
+        state: dict = self._model.get_state()
+        version: int = self._next_version
+        if version >= self._capacity:
+            self._drop_oldest()
+
+        is_keyframe: bool = (
+            not self._next_version
+            or self._snapshots_since_keyframe + 1 >= self._keyframe_interval
+            or self._capacity == 1
+        )
+        if is_keyframe:
+            changes: dict = dict(state)
+            self._snapshots_since_keyframe = 0
+        else:
+            changes = {
+                field: value
+                for field, value in state.items()
+                if field not in self._last_state or self._last_state[field] != value
+            }
+            self._snapshots_since_keyframe += 1
+
+        self._snapshots[version % self._capacity] = ModelSnapshot(changes, is_keyframe)
+        self._last_state = state
+        self._next_version += 1
+        return version
+
+    def state_at(self, version: int) -> dict:
+        """
+        Returns the model state at the given version.
+        """
+        if not self.oldest_version <= version < self._next_version:
+            raise ValueError(f"Version {version} is not in the history")
+
+        keyframe_version: int = version
+        while not self._snapshots[keyframe_version % self._capacity].is_keyframe:
+            keyframe_version -= 1
+
+        state: dict = {}
+        for snapshot_version in range(keyframe_version, version + 1):
+            state.update(self._snapshots[snapshot_version % self._capacity].changes)
+        return state
+
+    def restore(self, version: int):
+        """
+        Restores the model to the given version.
+        """
+        self._model.set_state(self.state_at(version))
+
+    def _drop_oldest(self):
+        """
+        Drops the oldest snapshot to free its slot.
+        The next snapshot becomes the oldest one, so it is turned
+        into a keyframe if it depends on the dropped snapshots.
+        """
+        next_oldest: int = self.oldest_version + 1
+        if next_oldest >= self._next_version:
+            return
+        snapshot: ModelSnapshot = self._snapshots[next_oldest % self._capacity]
+        if not snapshot.is_keyframe:
+            self._snapshots[next_oldest % self._capacity] = ModelSnapshot(
+                self.state_at(next_oldest), is_keyframe=True
+            )
+
+
+class SnapshotManager:
+    """
+    Keeps a bounded snapshot history for every model.
+    """
+
+    def __init__(self, capacity: int = 64, keyframe_interval: int = 16):
+        self._capacity = capacity
+        self._keyframe_interval = keyframe_interval
+        self._histories: Dict[DBModelInterface, ModelHistory] = {}
+
+    def history(self, model: DBModelInterface) -> ModelHistory:
+        history: Optional[ModelHistory] = self._histories.get(model)
+        if history is None:
+            history = ModelHistory(model, self._capacity, self._keyframe_interval)
+            self._histories[model] = history
+        return history
+
+    def push(self, model: DBModelInterface) -> int:
+        return self.history(model).push()
+
+    def restore(self, model: DBModelInterface, version: int):
+        self.history(model).restore(version)
+
+
+if __name__ == "__main__":
+    # client code
+    bob = User(str(uuid.uuid4()), "Bob", "bob_pass", 100)
+    bob.save()
+
+    snapshot_manager = SnapshotManager(capacity=8, keyframe_interval=4)
+    first_version: int = snapshot_manager.push(bob)
+    for new_balance in range(90, 0, -10):
+        bob.update(balance=new_balance)
+        snapshot_manager.push(bob)
+    bob.update(username="Robert")
+    last_version: int = snapshot_manager.push(bob)
+
+    history = snapshot_manager.history(bob)
+    print(f"Versions {history.oldest_version}..{history.latest_version} are kept")
+    snapshot_manager.restore(bob, history.oldest_version)
+    print(f"Restored to version {history.oldest_version}: {bob.get_state()}")
+    snapshot_manager.restore(bob, last_version)
+    print(f"Restored to version {last_version}: {bob.get_state()}")
@@ -1,8 +1,16 @@
 import uuid
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-from behavioral.memento.db_models import DBModelInterface, User
+from behavioral.journal import (
+    BEGIN,
+    COMMIT,
+    ROLLBACK,
+    UNDO,
+    JournalError,
+    TransactionJournal,
+)
+from behavioral.memento.db_models import DB, DBModelInterface, UnitOfWork, User
 
 
 class MementoInterface(ABC):
@@ -49,6 +57,14 @@ class CommandInterface(ABC):
         Rolls the command result back.
         """
 
+    def undo_record(self) -> Optional[Tuple[str, dict]]:
+        """
+        Returns the name and arguments of an undo action
+        which can be journaled and applied after a crash,
+        or None if the command can't be undone this way.
+        """
+        return None
+
 
 class BaseBalanceCommand(CommandInterface, ABC):
     """
@@ -63,6 +79,9 @@ class BaseBalanceCommand(CommandInterface, ABC):
 class UpdateBalanceCommand(BaseBalanceCommand):
     """
     Updates a balance.
+    The new balance is written without a version check, so the command
+    is not supported for concurrent updates: a balance computed from
+    a stale read overwrites them. Use OptimisticTransaction instead.
     """
 
     def __init__(self, db_model: DBModelInterface, new_balance: float):
@@ -82,17 +101,53 @@ class UpdateBalanceCommand(BaseBalanceCommand):
         """
         self._db_model.update(balance=self._balance_before_update.state)
 
+    def undo_record(self) -> Optional[Tuple[str, dict]]:
+        user_id: Optional[str] = getattr(self._db_model, "user_id", None)
+        if user_id is None:
+            return None
+        return "restore_balance", {
+            "user_id": user_id,
+            "balance": self._db_model.balance,
+        }
+
+
+def _restore_balance(arguments: dict):
+    record: Optional[dict] = DB.get(arguments["user_id"])
+    if record is not None:
+        User.write_record(dict(record, balance=arguments["balance"]))
+
+
+# undo actions which can be applied by TransactionJournal.recover after a crash
+UNDO_ACTIONS: Dict[str, Callable[[dict], None]] = {
+    "restore_balance": _restore_balance,
+}
+
 
 class Transaction:
     """
     The class is an invoker of registered commands
     which wraps their execution into a transaction:
     if any of the commands fail -> all executed commands are rolled back.
+    Executed commands are kept in an undo log, so the transaction can be
+    rolled back to a savepoint: only the commands executed after it
+    are undone, in reverse order.
+    If a journal is given, the undo record of every command is made
+    durable before the command is executed.
+    If a unit of work is given, the changed models are written once on commit
+    and nothing is written if the transaction is rolled back.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        journal: Optional[TransactionJournal] = None,
+        unit_of_work: Optional[UnitOfWork] = None,
+    ):
         self._commands_to_execute: List[CommandInterface] = []
-        self._executed_commands: List[CommandInterface] = []
+        self._undo_log: List[CommandInterface] = []
+        self._journal = journal
+        self._unit_of_work = unit_of_work
+        self._transaction_id: str = str(uuid.uuid4())
+        self._started: bool = False
 
     def register_command(self, command: CommandInterface):
         self._commands_to_execute.append(command)
@@ -104,22 +159,127 @@ class Transaction:
         """
         for command in self._commands_to_execute:
             try:
-                # execute the command
-                command.execute()
+                self.run(command)
             except Exception as e:
                 # if any exception occurs -> rollback all previously executed commands
                 print(f"Error occurred while executing a command: {e}")
-                self._rollback()
+                self.rollback()
                 break
+        else:
+            self.commit()
 
-            self._executed_commands.append(command)
+    def run(self, command: CommandInterface):
+        """
+        Executes a command right away and adds it to the undo log.
+        """
+        if not self._started:
+            self._write_to_journal({"type": BEGIN}, durable=False)
+            self._started = True
+        self._journal_undo_record(command)
+        command.execute()
+        self._undo_log.append(command)
+
+    def savepoint(self) -> int:
+        """
+        Returns a savepoint the transaction can be rolled back to.
+        """
+        return len(self._undo_log)
 
-    def _rollback(self):
+    def rollback_to(self, savepoint: int):
+        """
+        Undoes the commands executed after the savepoint, the last one first.
+        """
+        if not 0 <= savepoint <= len(self._undo_log):
+            raise ValueError(f"Savepoint {savepoint} was already rolled back")
+        while len(self._undo_log) > savepoint:
+            self._undo_log.pop().undo()
+
+    def nested(self) -> "NestedTransaction":
+        return NestedTransaction(self)
+
+    def commit(self):
+        """
+        Writes the changes and makes the commit durable. If the journal
+        can't be written, the transaction is rolled back,
+        as recovery would roll it back too.
+        """
+        if self._unit_of_work is not None:
+            self._unit_of_work.commit()
+        try:
+            self._write_to_journal({"type": COMMIT})
+        except JournalError as e:
+            print(f"Error occurred while committing the transaction: {e}")
+            self.rollback()
+            return
+        self._undo_log.clear()
+
+    def rollback(self):
         """
         Rolls back all previously executed commands.
         """
-        for command in self._executed_commands:
-            command.undo()
+        self.rollback_to(0)
+        if self._unit_of_work is not None:
+            self._unit_of_work.discard()
+        try:
+            self._write_to_journal({"type": ROLLBACK})
+        except JournalError as e:
+            # without the record, recovery applies the undo records once more
+            print(f"Error occurred while writing to the journal: {e}")
+
+    def _journal_undo_record(self, command: CommandInterface):
+        undo_record: Optional[Tuple[str, dict]] = command.undo_record()
+        if undo_record is not None:
+            action, arguments = undo_record
+            self._write_to_journal(
+                {"type": UNDO, "action": action, "arguments": arguments}
+            )
+
+    def _write_to_journal(self, record: dict, durable: bool = True):
+        if self._journal is not None:
+            record["transaction_id"] = self._transaction_id
+            self._journal.append(record, durable=durable)
+
+
+class NestedTransaction:
+    """
+    A transaction inside another transaction.
+    It shares the undo log of the parent and starts at a savepoint of it:
+    rolling the nested transaction back undoes only its own commands,
+    committing it leaves them to the parent transaction.
+    Used as a context manager, it is rolled back if an exception is raised.
+    """
+
+    def __init__(self, parent: Transaction):
+        self._parent = parent
+        self._savepoint: int = parent.savepoint()
+
+    def run(self, command: CommandInterface):
+        self._parent.run(command)
+
+    def savepoint(self) -> int:
+        return self._parent.savepoint()
+
+    def rollback_to(self, savepoint: int):
+        if savepoint < self._savepoint:
+            raise ValueError(f"Savepoint {savepoint} belongs to the parent transaction")
+        self._parent.rollback_to(savepoint)
+
+    def nested(self) -> "NestedTransaction":
+        return NestedTransaction(self._parent)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._parent.rollback_to(self._savepoint)
+
+    def __enter__(self) -> "NestedTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None:
+            self.rollback()
+        return False
 
 
 if __name__ == "__main__":
@@ -134,9 +294,36 @@ if __name__ == "__main__":
     update_alice_balance_command = UpdateBalanceCommand(alice, 80)
 
     # create a transaction and register commands
-    transaction = Transaction()
+    unit_of_work = UnitOfWork()
+    unit_of_work.register(bob)
+    unit_of_work.register(alice)
+    transaction = Transaction(unit_of_work=unit_of_work)
     transaction.register_command(update_bob_balance_command)
     transaction.register_command(update_alice_balance_command)
+    for new_balance in range(60, 0, -10):
+        transaction.register_command(UpdateBalanceCommand(bob, new_balance))
 
     # execute the transaction
     transaction.execute()
+    print(
+        f"{unit_of_work.updates} updates were written"
+        f" with {unit_of_work.writes} writes, "
+        f"{unit_of_work.writes_saved} writes saved"
+    )
+
+    # retry a failed segment of a batch job without replaying the whole transaction
+    batch_transaction = Transaction()
+    batch_transaction.run(UpdateBalanceCommand(alice, 100))
+    for attempt in range(3):
+        try:
+            with batch_transaction.nested() as segment:
+                segment.run(UpdateBalanceCommand(alice, 90))
+                segment.run(UpdateBalanceCommand(alice, 85))
+                if attempt == 0:
+                    raise RuntimeError("The segment failed")
+        except RuntimeError as e:
+            print(f"{e}, Alice's balance is back to {alice.balance}")
+            continue
+        break
+    batch_transaction.commit()
+    print(f"Alice's balance after the batch job: {alice.balance}")
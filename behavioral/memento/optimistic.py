@@ -0,0 +1,106 @@
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from behavioral.memento.db_models import DB, DB_WRITE_LOCK, VERSION_FIELD, User
+
+
+class ConflictError(Exception):
+    """
+    This exception is raised when a record read by a transaction
+    was changed by another transaction before the commit.
+    """
+
+
+class OptimisticTransaction:
+    """
+    A transaction which does not lock records while it runs.
+    It remembers the version of every record it reads and keeps its writes
+    as new versions of the records. On commit the read versions are checked:
+    if any of the records has changed meanwhile, the transaction fails
+    with ConflictError and nothing is written.
+    Readers never block, only the commit takes the write lock.
+    """
+
+    def __init__(self):
+        self._reads: Dict[str, dict] = {}
+        self._writes: Dict[str, dict] = {}
+
+    def read(self, user_id: str) -> dict:
+        """
+        Returns the record as seen by the transaction.
+        Reading a record twice returns the same version.
+        """
+        record: Optional[dict] = self._writes.get(user_id) or self._reads.get(user_id)
+        if record is not None:
+            return record
+        record = DB.get(user_id)
+        if record is None:
+            raise KeyError(user_id)
+        self._reads[user_id] = record
+        return record
+
+    def write(self, user_id: str, **kwargs):
+        """
+        Changes the fields of a record. The change is visible
+        to other transactions only after the commit.
+        """
+        record: dict = dict(self.read(user_id))
+        record.update(kwargs)
+        self._writes[user_id] = record
+
+    def commit(self):
+        with DB_WRITE_LOCK:
+            for user_id, record in self._reads.items():
+                if DB[user_id][VERSION_FIELD] != record[VERSION_FIELD]:
+                    raise ConflictError(
+                        f"User {user_id} was changed by another transaction"
+                    )
+            for record in self._writes.values():
+                User.write_record(record)
+
+    @classmethod
+    def run(
+        cls, work: Callable[["OptimisticTransaction"], Any], max_attempts: int = 100
+    ) -> Any:
+        """
+        Runs the work in a new transaction and commits it.
+        The work is retried in a new transaction on a conflict.
+        Returns the result of the work.
+        """
+        for _ in range(max_attempts):
+            transaction = cls()
+            result: Any = work(transaction)
+            try:
+                transaction.commit()
+            except ConflictError:
+                continue
+            return result
+        raise ConflictError(f"The transaction conflicted {max_attempts} times")
+
+
+def transfer(
+    from_user_id: str, to_user_id: str, amount: float, max_attempts: int = 100
+):
+    """
+    Moves the amount from one balance to another.
+    """
+
+    def work(transaction: OptimisticTransaction):
+        from_balance: float = transaction.read(from_user_id)["balance"]
+        to_balance: float = transaction.read(to_user_id)["balance"]
+        transaction.write(from_user_id, balance=from_balance - amount)
+        transaction.write(to_user_id, balance=to_balance + amount)
+
+    OptimisticTransaction.run(work, max_attempts)
+
+
+if __name__ == "__main__":
+    # client code
+    bob = User(str(uuid.uuid4()), "Bob", "bob_pass", 100)
+    alice = User(str(uuid.uuid4()), "Alice", "alice_pass", 50)
+    bob.save()
+    alice.save()
+
+    # the transfer is retried if another thread changes a balance meanwhile
+    transfer(bob.user_id, alice.user_id, 30)
+    print(f"Bob's balance: {bob.balance}, Alice's balance: {alice.balance}")
@@ -0,0 +1,372 @@
+"""
+Benchmarks for the exchange notifications.
+Run with: python -m behavioral.observer.benchmark
+"""
+
+import multiprocessing
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from behavioral.observer.dispatcher import (
+    BLOCK,
+    COALESCE,
+    DROP_OLDEST,
+    QueuedDispatcher,
+)
+from behavioral.observer.observer import Exchange, SubscriberInterface
+from behavioral.observer.price_index import IntervalIndex, ThresholdIndex
+from behavioral.observer.shared_prices import SharedTickerTable
+from behavioral.observer.tick_history import TickRingBuffer
+
+
+class CountingSubscriber(SubscriberInterface):
+    """
+    Counts the calls and keeps the latest prices instead of printing them.
+    """
+
+    def __init__(self):
+        self.calls: int = 0
+        self.prices: Dict[str, float] = {}
+
+    def notify(self, ticker: str, price: float):
+        self.calls += 1
+        self.prices[ticker] = price
+
+    def notify_many(self, prices: Dict[str, float]):
+        self.calls += 1
+        self.prices.update(prices)
+
+
+class SlowSubscriber(CountingSubscriber):
+    """
+    Spends some time on every notification.
+    """
+
+    def __init__(self, delay: float):
+        super(SlowSubscriber, self).__init__()
+        self._delay = delay
+
+    def notify(self, ticker: str, price: float):
+        time.sleep(self._delay)
+        super(SlowSubscriber, self).notify(ticker, price)
+
+    def notify_many(self, prices: Dict[str, float]):
+        time.sleep(self._delay)
+        super(SlowSubscriber, self).notify_many(prices)
+
+
+def benchmark_batch_updates(
+    number_of_tickers: int = 500,
+    number_of_subscribers: int = 20,
+    ticks_per_ticker: int = 5,
+    bursts: int = 10,
+):
+    """
+    Compares per-tick dispatch with coalesced batch dispatch
+    for bursts of ticks where every ticker changes several times.
+    """
+    tickers: List[str] = [f"T{i}" for i in range(number_of_tickers)]
+    generator = random.Random(0)
+    burst_ticks: List[List[Tuple[str, float]]] = [
+        [
+            (ticker, generator.uniform(1, 1000))
+            for ticker in tickers
+            for _ in range(ticks_per_ticker)
+        ]
+        for _ in range(bursts)
+    ]
+    for burst in burst_ticks:
+        generator.shuffle(burst)
+
+    print(f"{'dispatch':>10} {'notifications':>14} {'ms per burst':>13}")
+    results: List[Dict[str, float]] = []
+    for dispatch in ("per-tick", "batch"):
+        exchange = Exchange({ticker: 0.0 for ticker in tickers})
+        subscribers: List[CountingSubscriber] = [
+            CountingSubscriber() for _ in range(number_of_subscribers)
+        ]
+        for subscriber in subscribers:
+            for ticker in tickers:
+                exchange.add_subscriber(ticker, subscriber)
+
+        started_at: float = time.perf_counter()
+        for burst in burst_ticks:
+            if dispatch == "batch":
+                exchange.update_ticker_prices(burst)
+            else:
+                for ticker, price in burst:
+                    exchange.update_ticker_price(ticker, price)
+        elapsed: float = time.perf_counter() - started_at
+        notifications: int = sum(subscriber.calls for subscriber in subscribers)
+        results.append(subscribers[0].prices)
+        print(f"{dispatch:>10} {notifications:>14} {elapsed / bursts * 1000:>13.2f}")
+    assert results[0] == results[1], "Both dispatches must end with the same prices"
+
+
+def benchmark_slow_subscriber(
+    updates: int = 2000, number_of_tickers: int = 50, delay: float = 0.001
+):
+    """
+    Measures the publishing time when one of the subscribers is slow
+    with inline dispatch and with queued dispatch for every overflow policy.
+    """
+    tickers: List[str] = [f"T{i}" for i in range(number_of_tickers)]
+    print(
+        f"{'dispatch':>18} {'publish us/update':>18} {'fast delivered':>15}"
+        f" {'slow delivered':>15} {'slow dropped':>13} {'slow max lag ms':>16}"
+    )
+    for policy in (None, DROP_OLDEST, COALESCE, BLOCK):
+        dispatcher = (
+            QueuedDispatcher(max_queue_size=100, overflow_policy=policy)
+            if policy
+            else None
+        )
+        exchange = Exchange({ticker: 0.0 for ticker in tickers}, dispatcher=dispatcher)
+        fast_subscriber = CountingSubscriber()
+        slow_subscriber = SlowSubscriber(delay)
+        for ticker in tickers:
+            exchange.add_subscriber(ticker, fast_subscriber)
+            exchange.add_subscriber(ticker, slow_subscriber)
+
+        number_of_updates: int = updates if policy else updates // 10
+        started_at: float = time.perf_counter()
+        for i in range(number_of_updates):
+            exchange.update_ticker_price(tickers[i % number_of_tickers], float(i))
+        elapsed: float = time.perf_counter() - started_at
+
+        if dispatcher is None:
+            slow_stats: dict = {
+                "delivered": slow_subscriber.calls,
+                "dropped": 0,
+                "max_lag": 0.0,
+            }
+            fast_delivered: int = fast_subscriber.calls
+        else:
+            dispatcher.close()
+            slow_stats = dispatcher.lag(slow_subscriber)
+            fast_delivered = dispatcher.lag(fast_subscriber)["delivered"]
+        print(
+            f"{policy or 'inline':>18} {elapsed / number_of_updates * 1e6:>18.1f}"
+            f" {fast_delivered:>15}"
+            f" {slow_stats['delivered']:>15} {slow_stats['dropped']:>13}"
+            f" {slow_stats['max_lag'] * 1000:>16.1f}"
+        )
+        assert slow_subscriber.prices == fast_subscriber.prices or policy == DROP_OLDEST
+
+
+def benchmark_price_bands(
+    subscriber_counts=(1000, 10_000, 100_000), updates: int = 1000
+):
+    """
+    Compares finding the band and crossing subscribers of a price update
+    with the interval and threshold indexes against checking every subscription.
+    """
+    generator = random.Random(0)
+    print(f"{'subscribers':>11} {'matches':>8} {'indexed us':>11} {'scan us':>9}")
+    for number_of_subscribers in subscriber_counts:
+        bands: List[Tuple[float, float, CountingSubscriber]] = []
+        thresholds: List[Tuple[float, CountingSubscriber]] = []
+        band_index = IntervalIndex()
+        threshold_index = ThresholdIndex()
+        for _ in range(number_of_subscribers):
+            subscriber = CountingSubscriber()
+            low: float = generator.uniform(50, 150)
+            band: Tuple[float, float, CountingSubscriber] = (
+                low,
+                low + generator.uniform(0, 1),
+                subscriber,
+            )
+            bands.append(band)
+            band_index.add(*band)
+            threshold: float = generator.uniform(50, 150)
+            thresholds.append((threshold, subscriber))
+            threshold_index.add(threshold, subscriber)
+
+        prices: List[float] = [100.0]
+        for _ in range(updates):
+            prices.append(prices[-1] + generator.gauss(0, 0.1))
+
+        # the tree is built on the first query
+        band_index.stab(prices[0])
+        matches: int = 0
+        started_at: float = time.perf_counter()
+        for old_price, price in zip(prices, prices[1:]):
+            matches += len(band_index.stab(price)) + len(
+                threshold_index.crossed(old_price, price)
+            )
+        indexed_time: float = time.perf_counter() - started_at
+
+        scanned_matches: int = 0
+        started_at = time.perf_counter()
+        for old_price, price in zip(prices, prices[1:]):
+            low, high = min(old_price, price), max(old_price, price)
+            scanned_matches += sum(
+                1 for band_low, band_high, _ in bands if band_low <= price <= band_high
+            )
+            scanned_matches += sum(
+                1 for threshold, _ in thresholds if low < threshold <= high
+            )
+        scan_time: float = time.perf_counter() - started_at
+        assert matches == scanned_matches, (matches, scanned_matches)
+        print(
+            f"{number_of_subscribers:>11} {matches / updates:>8.1f}"
+            f" {indexed_time / updates * 1e6:>11.1f} {scan_time / updates * 1e6:>9.1f}"
+        )
+
+
+def benchmark_tick_indicators(
+    windows=(20, 200, 2000), ticks: int = 5000, capacity: int = 4096
+):
+    """
+    Compares computing the indicators on every tick from Python lists
+    with the NumPy tick ring buffer.
+    """
+    generator = random.Random(0)
+    prices: List[float] = [100.0]
+    for _ in range(ticks + capacity):
+        prices.append(prices[-1] * (1 + generator.gauss(0, 0.001)))
+    volumes: List[float] = [generator.uniform(1, 100) for _ in prices]
+
+    print(f"{'window':>7} {'lists us/tick':>14} {'ring buffer us/tick':>20}")
+    for window in windows:
+        price_list: List[float] = prices[:capacity]
+        volume_list: List[float] = volumes[:capacity]
+        started_at: float = time.perf_counter()
+        for price, volume in zip(prices[capacity:], volumes[capacity:]):
+            price_list.append(price)
+            volume_list.append(volume)
+            if len(price_list) > capacity:
+                del price_list[0]
+                del volume_list[0]
+            window_prices: List[float] = price_list[-window:]
+            window_volumes: List[float] = volume_list[-window:]
+            list_indicators = (
+                sum(window_prices) / window,
+                sum(p * v for p, v in zip(window_prices, window_volumes))
+                / sum(window_volumes),
+                min(window_prices),
+                max(window_prices),
+                [
+                    b / a - 1
+                    for a, b in zip(price_list[-window - 1 :], price_list[-window:])
+                ],
+            )
+        list_time: float = time.perf_counter() - started_at
+
+        ring_buffer = TickRingBuffer(capacity)
+        ring_buffer.extend(prices[:capacity], volumes[:capacity])
+        started_at = time.perf_counter()
+        for price, volume in zip(prices[capacity:], volumes[capacity:]):
+            ring_buffer.append(price, volume)
+            ring_buffer_indicators = (
+                ring_buffer.moving_average(window),
+                ring_buffer.vwap(window),
+                *ring_buffer.min_max(window),
+                ring_buffer.returns(window),
+            )
+        ring_buffer_time: float = time.perf_counter() - started_at
+        assert abs(list_indicators[1] - ring_buffer_indicators[1]) < 1e-6
+        print(
+            f"{window:>7} {list_time / ticks * 1e6:>14.1f}"
+            f" {ring_buffer_time / ticks * 1e6:>20.1f}"
+        )
+
+
+def _shared_table_reader(table: SharedTickerTable, last_price: float, results):
+    latencies: List[float] = []
+    version: int = table.version
+    price: float = table.read("T0")
+    while price < last_price:
+        version = table.wait_for_change(version)
+        price, updated_at, _ = table.read_slot("T0")
+        latencies.append(time.monotonic() - updated_at)
+    results.put(latencies)
+    table.close()
+
+
+def _pipe_reader(connection, last_price: float, results):
+    latencies: List[float] = []
+    price: float = -1.0
+    while price < last_price:
+        price, sent_at = connection.recv()
+        latencies.append(time.monotonic() - sent_at)
+    results.put(latencies)
+
+
+def benchmark_shared_prices(
+    reader_counts=(1, 4), updates: int = 2000, interval: float = 0.0005
+):
+    """
+    Measures the latency from a price update to its read in other processes
+    with the shared ticker table and with a pipe per process,
+    and the publishing cost.
+    """
+    print(
+        f"{'transport':>10} {'readers':>8} {'publish us':>11}"
+        f" {'p50 latency us':>15} {'p99 latency us':>15}"
+    )
+    last_price: float = float(updates - 1)
+    for number_of_readers in reader_counts:
+        for transport in ("shared", "pipe"):
+            results = multiprocessing.Queue()
+            if transport == "shared":
+                table = SharedTickerTable.create({"T0": -1.0})
+                processes = [
+                    multiprocessing.Process(
+                        target=_shared_table_reader, args=(table, last_price, results)
+                    )
+                    for _ in range(number_of_readers)
+                ]
+
+                def publish(price: float):
+                    table.publish("T0", price)
+
+            else:
+                pipes = [
+                    multiprocessing.Pipe(duplex=False) for _ in range(number_of_readers)
+                ]
+                processes = [
+                    multiprocessing.Process(
+                        target=_pipe_reader, args=(receiver, last_price, results)
+                    )
+                    for receiver, _ in pipes
+                ]
+
+                def publish(price: float):
+                    sent_at: float = time.monotonic()
+                    for _, sender in pipes:
+                        sender.send((price, sent_at))
+
+            for process in processes:
+                process.start()
+            time.sleep(0.5)
+
+            publish_time: float = 0.0
+            for i in range(updates):
+                started_at: float = time.perf_counter()
+                publish(float(i))
+                publish_time += time.perf_counter() - started_at
+                time.sleep(interval)
+            latencies: List[float] = sorted(
+                latency for _ in processes for latency in results.get(timeout=60)
+            )
+            for process in processes:
+                process.join()
+            if transport == "shared":
+                table.close()
+            print(
+                f"{transport:>10} {number_of_readers:>8}"
+                f" {publish_time / updates * 1e6:>11.1f}"
+                f" {statistics.median(latencies) * 1e6:>15.1f}"
+                f" {latencies[int(len(latencies) * 0.99)] * 1e6:>15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    benchmark_batch_updates()
+    benchmark_slow_subscriber()
+    benchmark_price_bands()
+    benchmark_tick_indicators()
+    benchmark_shared_prices()
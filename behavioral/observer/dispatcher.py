@@ -0,0 +1,265 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from behavioral.observer.observer import SubscriberInterface
+
+DROP_OLDEST: str = "drop_oldest"
+COALESCE: str = "coalesce"
+BLOCK: str = "block"
+OVERFLOW_POLICIES: Tuple[str, ...] = (DROP_OLDEST, COALESCE, BLOCK)
+
+
+class DispatcherInterface(ABC):
+    """
+    The interface of the ways an exchange delivers prices to subscribers.
+    """
+
+    @abstractmethod
+    def dispatch(self, subscriber: "SubscriberInterface", prices: Dict[str, float]):
+        """
+        Delivers the changed prices to the subscriber.
+        """
+
+    @abstractmethod
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until all dispatched prices are delivered.
+        Returns False if they were not delivered within the timeout.
+        """
+
+    @abstractmethod
+    def close(self):
+        """
+        Delivers the queued prices and stops the dispatcher.
+        """
+
+
+class SubscriberQueue:
+    """
+    A bounded queue of price updates of one subscriber
+    and its delivery statistics.
+    Queued updates are (ticker, price, enqueued_at) tuples.
+    """
+
+    def __init__(
+        self, subscriber: "SubscriberInterface", max_size: int, overflow_policy: str
+    ):
+        self.subscriber = subscriber
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.condition = threading.Condition()
+        # a coalescing queue keeps one update per ticker
+        self.updates: Deque[Tuple[str, float, float]] = deque()
+        self.latest: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.scheduled: bool = False
+        self.delivered: int = 0
+        self.dropped: int = 0
+        self.coalesced: int = 0
+        self.errors: int = 0
+        self.last_lag: float = 0.0
+        self.max_lag: float = 0.0
+
+    def __len__(self) -> int:
+        return (
+            len(self.latest) if self.overflow_policy == COALESCE else len(self.updates)
+        )
+
+    def put(
+        self, prices: Dict[str, float], on_full: Optional[Callable[[], None]] = None
+    ):
+        """
+        Adds the updates, applying the overflow policy. Runs under the condition.
+        A blocking queue calls on_full before it waits,
+        so the queue is drained even if it fills up within one put.
+        """
+        enqueued_at: float = time.perf_counter()
+        for ticker, price in prices.items():
+            if self.overflow_policy == COALESCE:
+                if ticker in self.latest:
+                    # the tick waits as long as the first replaced one
+                    self.latest[ticker] = (price, self.latest[ticker][1])
+                    self.coalesced += 1
+                    continue
+                if len(self.latest) >= self.max_size:
+                    self.latest.popitem(last=False)
+                    self.dropped += 1
+                self.latest[ticker] = (price, enqueued_at)
+                continue
+
+            if len(self.updates) >= self.max_size:
+                if self.overflow_policy == BLOCK:
+                    if on_full is not None:
+                        on_full()
+                    while len(self.updates) >= self.max_size:
+                        self.condition.wait()
+                else:
+                    self.updates.popleft()
+                    self.dropped += 1
+            self.updates.append((ticker, price, enqueued_at))
+
+    def take(self) -> List[Tuple[str, float, float]]:
+        """
+        Removes and returns all queued updates. Runs under the condition.
+        """
+        if self.overflow_policy == COALESCE:
+            updates = [
+                (ticker, price, enqueued_at)
+                for ticker, (price, enqueued_at) in self.latest.items()
+            ]
+            self.latest.clear()
+        else:
+            updates = list(self.updates)
+            self.updates.clear()
+        self.condition.notify_all()
+        return updates
+
+    def to_dict(self) -> dict:
+        with self.condition:
+            return {
+                "queued": len(self),
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "last_lag": self.last_lag,
+                "max_lag": self.max_lag,
+            }
+
+
+class QueuedDispatcher(DispatcherInterface):
+    """
+    Delivers prices in the background, so a slow subscriber
+    does not delay the price updates and the other subscribers.
+    Every subscriber has a bounded queue which is drained by a pool of workers,
+    one worker at a time per subscriber, so updates are delivered in order.
+    When a queue is full, the overflow policy decides what happens:
+    drop_oldest drops the oldest update, coalesce keeps only the latest
+    price of every ticker, block makes the publisher wait.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        overflow_policy: str = DROP_OLDEST,
+        workers: int = 4,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow_policy}")
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be positive")
+        self._max_queue_size = max_queue_size
+        self._overflow_policy = overflow_policy
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="subscriber"
+        )
+        self._queues: Dict["SubscriberInterface", SubscriberQueue] = {}
+        self._queues_lock = threading.Lock()
+
+    def dispatch(self, subscriber: "SubscriberInterface", prices: Dict[str, float]):
+        queue: SubscriberQueue = self._queue_of(subscriber)
+        with queue.condition:
+            queue.put(prices, on_full=lambda: self._schedule_drain(queue))
+            self._schedule_drain(queue)
+
+    def lag(self, subscriber: "SubscriberInterface") -> Dict[str, float]:
+        """
+        Returns the delivery statistics of a subscriber.
+        Lag is the time in seconds from the price update to its delivery.
+        """
+        return self._queue_of(subscriber).to_dict()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Returns the delivery statistics of all subscribers
+        keyed by the subscriber class name and id.
+        """
+        with self._queues_lock:
+            queues: List[SubscriberQueue] = list(self._queues.values())
+        return {
+            f"{type(queue.subscriber).__name__}:{id(queue.subscriber)}": queue.to_dict()
+            for queue in queues
+        }
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline: Optional[float] = (
+            None if timeout is None else time.monotonic() + timeout
+        )
+        with self._queues_lock:
+            queues: List[SubscriberQueue] = list(self._queues.values())
+        for queue in queues:
+            with queue.condition:
+                while queue.scheduled:
+                    remaining: Optional[float] = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                    queue.condition.wait(remaining)
+        return True
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _queue_of(self, subscriber: "SubscriberInterface") -> SubscriberQueue:
+        queue: Optional[SubscriberQueue] = self._queues.get(subscriber)
+        if queue is None:
+            with self._queues_lock:
+                queue = self._queues.setdefault(
+                    subscriber,
+                    SubscriberQueue(
+                        subscriber, self._max_queue_size, self._overflow_policy
+                    ),
+                )
+        return queue
+
+    def _schedule_drain(self, queue: SubscriberQueue):
+        """
+        Starts draining the queue unless it is already scheduled.
+        Runs under the condition of the queue.
+        """
+        if not queue.scheduled:
+            queue.scheduled = True
+            self._executor.submit(self._drain, queue)
+
+    def _drain(self, queue: SubscriberQueue):
+        """
+        Delivers the queued updates of one subscriber.
+        The worker is given back to the pool after every batch,
+        so a busy subscriber does not keep it from the others.
+        """
+        with queue.condition:
+            updates: List[Tuple[str, float, float]] = queue.take()
+
+        errors: int = 0
+        try:
+            if queue.overflow_policy == COALESCE:
+                queue.subscriber.notify_many(
+                    {ticker: price for ticker, price, _ in updates}
+                )
+            else:
+                for ticker, price, _ in updates:
+                    try:
+                        queue.subscriber.notify(ticker, price)
+                    except Exception:
+                        errors += 1
+        except Exception:
+            errors += 1
+        delivered_at: float = time.perf_counter()
+
+        with queue.condition:
+            queue.delivered += len(updates)
+            queue.errors += errors
+            if updates:
+                queue.last_lag = delivered_at - updates[-1][2]
+                queue.max_lag = max(queue.max_lag, delivered_at - updates[0][2])
+            if len(queue):
+                self._executor.submit(self._drain, queue)
+            else:
+                queue.scheduled = False
+                queue.condition.notify_all()
@@ -1,5 +1,17 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from behavioral.observer.dispatcher import (
+    COALESCE,
+    DispatcherInterface,
+    QueuedDispatcher,
+)
+from behavioral.observer.price_index import IntervalIndex, ThresholdIndex
+
+if TYPE_CHECKING:
+    from behavioral.observer.shared_prices import SharedTickerTable
+    from behavioral.observer.tick_history import TickHistory
 
 
 class SubscriberInterface(ABC):
@@ -15,6 +27,15 @@ class SubscriberInterface(ABC):
         a price of the ticker changes.
         """
 
+    def notify_many(self, prices: Dict[str, float]):
+        """
+        This method is called by a publisher when
+        prices of several tickers change at once.
+        Notifies about every ticker one by one unless overridden.
+        """
+        for ticker, price in prices.items():
+            self.notify(ticker, price)
+
 
 class LongTermInvestor(SubscriberInterface):
     """
@@ -42,14 +63,39 @@ class Exchange:
     """
     This class imitates a currency exchange that
     notifies the users when the desired price change occurs.
+    Subscribers are notified inline unless a dispatcher is given,
+    which can deliver the prices in the background.
+    Besides every change, a subscriber can subscribe to the changes
+    within a price band or to the moves across a price threshold,
+    so only the matching subscribers are looked up on an update.
+    If a tick history is given, every tick is recorded in it.
+    If a shared ticker table is given, the prices are published to it
+    for the subscribers running in other processes.
     """
 
-    def __init__(self):
-        self._tickers: dict = {
-            "AAPL": 100.12,
-            "AMZN": 321.23,
-        }
+    def __init__(
+        self,
+        tickers: Optional[Dict[str, float]] = None,
+        dispatcher: Optional[DispatcherInterface] = None,
+        history: Optional["TickHistory"] = None,
+        shared_table: Optional["SharedTickerTable"] = None,
+    ):
+        self._tickers: dict = (
+            dict(tickers)
+            if tickers is not None
+            else {
+                "AAPL": 100.12,
+                "AMZN": 321.23,
+            }
+        )
         self._ticker_subscribers: dict = defaultdict(list)
+        self._band_subscribers: Dict[str, IntervalIndex] = defaultdict(IntervalIndex)
+        self._crossing_subscribers: Dict[str, ThresholdIndex] = defaultdict(
+            ThresholdIndex
+        )
+        self._dispatcher = dispatcher
+        self._history = history
+        self._shared_table = shared_table
 
     def add_subscriber(self, ticker: str, subscriber: SubscriberInterface):
         """
@@ -57,23 +103,126 @@ class Exchange:
         """
         self._ticker_subscribers[ticker].append(subscriber)
 
-    def update_ticker_price(self, ticker: str, price: float):
+    def add_band_subscriber(
+        self, ticker: str, subscriber: SubscriberInterface, low: float, high: float
+    ):
+        """
+        Adds a subscriber which is notified when the new price
+        of the ticker is within the band [low, high].
+        """
+        self._band_subscribers[ticker].add(low, high, subscriber)
+
+    def remove_band_subscriber(
+        self, ticker: str, subscriber: SubscriberInterface, low: float, high: float
+    ):
+        self._band_subscribers[ticker].remove(low, high, subscriber)
+
+    def add_crossing_subscriber(
+        self, ticker: str, subscriber: SubscriberInterface, threshold: float
+    ):
+        """
+        Adds a subscriber which is notified when the price
+        of the ticker moves across the threshold in any direction.
+        """
+        self._crossing_subscribers[ticker].add(threshold, subscriber)
+
+    def remove_crossing_subscriber(
+        self, ticker: str, subscriber: SubscriberInterface, threshold: float
+    ):
+        self._crossing_subscribers[ticker].remove(threshold, subscriber)
+
+    @property
+    def history(self) -> Optional["TickHistory"]:
+        return self._history
+
+    def update_ticker_price(self, ticker: str, price: float, volume: float = 1.0):
         """
         The method imitates the situation when the ticker price
         has changed, and we need to notify all interested subscribers.
         """
+        self._validate_ticker(ticker)
+
+        old_price: float = self._tickers[ticker]
+        self._tickers[ticker] = price
+        if self._history is not None:
+            self._history.record(ticker, price, volume)
+        if self._shared_table is not None:
+            self._shared_table.publish(ticker, price)
+        self._notify_subscribers(ticker, old_price, price)
+
+    def update_ticker_prices(
+        self, ticks: Union[Mapping[str, float], Iterable[Tuple[str, float]]]
+    ):
+        """
+        Applies a batch of ticks given as a mapping or (ticker, price) pairs.
+        Repeated ticks of a ticker are merged into the latest price,
+        and every subscriber is notified once with all its changed tickers.
+        Crossings are checked between the prices before and after the batch.
+        The tick history records every tick of the batch.
+        """
+        ticks = list(ticks.items()) if isinstance(ticks, Mapping) else list(ticks)
+        prices: Dict[str, float] = dict(ticks)
+        for ticker in prices:
+            self._validate_ticker(ticker)
+
+        old_prices: Dict[str, float] = {
+            ticker: self._tickers[ticker] for ticker in prices
+        }
+        self._tickers.update(prices)
+        if self._history is not None:
+            self._history.record_many(ticks)
+        if self._shared_table is not None:
+            self._shared_table.publish_many(prices)
+        subscriber_prices: Dict[SubscriberInterface, Dict[str, float]] = defaultdict(
+            dict
+        )
+        for ticker, price in prices.items():
+            for subscriber in self._subscribers_of(ticker, old_prices[ticker], price):
+                subscriber_prices[subscriber][ticker] = price
+        for subscriber, changed_prices in subscriber_prices.items():
+            if self._dispatcher is not None:
+                self._dispatcher.dispatch(subscriber, changed_prices)
+            else:
+                subscriber.notify_many(changed_prices)
+
+    def _validate_ticker(self, ticker: str):
+        """
+        Checks the ticker before any state is changed,
+        so an invalid tick does not leave the prices, the history
+        and the shared table out of sync.
+        """
         if ticker not in self._tickers:
             raise ValueError(f"Invalid ticker name: {ticker}")
+        if self._shared_table is not None and ticker not in self._shared_table:
+            raise ValueError(f"Ticker {ticker} is not in the shared table")
 
-        self._tickers[ticker] = price
-        self._notify_subscribers(ticker, price)
+    def _subscribers_of(
+        self, ticker: str, old_price: float, price: float
+    ) -> List[SubscriberInterface]:
+        """
+        Returns the subscribers interested in the price change,
+        each of them once.
+        """
+        subscribers: List[SubscriberInterface] = list(
+            self._ticker_subscribers.get(ticker, ())
+        )
+        bands: Optional[IntervalIndex] = self._band_subscribers.get(ticker)
+        if bands:
+            subscribers.extend(bands.stab(price))
+        crossings: Optional[ThresholdIndex] = self._crossing_subscribers.get(ticker)
+        if crossings:
+            subscribers.extend(crossings.crossed(old_price, price))
+        return list(dict.fromkeys(subscribers))
 
-    def _notify_subscribers(self, ticker: str, price: float):
+    def _notify_subscribers(self, ticker: str, old_price: float, price: float):
         """
         Internal method that notifies all interested subscribers.
         """
-        for subscriber in self._ticker_subscribers[ticker]:
-            subscriber.notify(ticker, price)
+        for subscriber in self._subscribers_of(ticker, old_price, price):
+            if self._dispatcher is not None:
+                self._dispatcher.dispatch(subscriber, {ticker: price})
+            else:
+                subscriber.notify(ticker, price)
 
 
 if __name__ == "__main__":
@@ -87,3 +236,21 @@ if __name__ == "__main__":
     exchange.add_subscriber("AMZN", beginner_investor)
 
     exchange.update_ticker_price("AMZN", 220.12)
+
+    exchange.add_subscriber("AAPL", beginner_investor)
+    exchange.update_ticker_prices([("AMZN", 221.5), ("AAPL", 99.8), ("AMZN", 222.4)])
+
+    # the long term investor only cares when AAPL falls below 90 or rises above 110
+    exchange.add_crossing_subscriber("AAPL", long_term_investor, 90.0)
+    exchange.add_crossing_subscriber("AAPL", long_term_investor, 110.0)
+    for new_price in (101.0, 95.0, 89.5, 91.0):
+        exchange.update_ticker_price("AAPL", new_price)
+
+    # the beginner investor reads the news slowly, but does not slow down the exchange
+    dispatcher = QueuedDispatcher(max_queue_size=10, overflow_policy=COALESCE)
+    background_exchange = Exchange(dispatcher=dispatcher)
+    background_exchange.add_subscriber("AMZN", beginner_investor)
+    for new_price in range(200, 300):
+        background_exchange.update_ticker_price("AMZN", new_price)
+    dispatcher.close()
+    print(dispatcher.lag(beginner_investor))
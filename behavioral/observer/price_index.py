@@ -0,0 +1,189 @@
+import math
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from behavioral.observer.observer import SubscriberInterface
+
+# (low, high, subscriber)
+Band = Tuple[float, float, "SubscriberInterface"]
+
+
+class IntervalNode:
+    """
+    A node of a centered interval tree.
+    Keeps the bands which contain the center sorted by low and by high,
+    the bands to the left and to the right of the center are in the children.
+    """
+
+    __slots__ = ("center", "by_low", "by_high", "left", "right")
+
+    def __init__(self, bands: List[Band]):
+        endpoints: List[float] = sorted(
+            endpoint for band in bands for endpoint in band[:2]
+        )
+        self.center: float = endpoints[len(endpoints) // 2]
+        left: List[Band] = []
+        right: List[Band] = []
+        overlapping: List[Band] = []
+        for band in bands:
+            if band[1] < self.center:
+                left.append(band)
+            elif band[0] > self.center:
+                right.append(band)
+            else:
+                overlapping.append(band)
+        self.by_low: List[Band] = sorted(overlapping, key=lambda band: band[0])
+        self.by_high: List[Band] = sorted(
+            overlapping, key=lambda band: band[1], reverse=True
+        )
+        self.left: Optional[IntervalNode] = IntervalNode(left) if left else None
+        self.right: Optional[IntervalNode] = IntervalNode(right) if right else None
+
+
+class IntervalIndex:
+    """
+    Price band subscriptions of one ticker.
+    A stabbing query returns the subscribers whose band contains a price
+    in O(log n + k) from a tree of the bands. Bands added since the tree was
+    built are kept in a pending list which is scanned, and removed bands
+    are skipped by the query. The tree is rebuilt only when there are more
+    such changes than the square root of the bands in the tree,
+    so changing a subscription does not cost a rebuild.
+    """
+
+    min_changes_before_rebuild: int = 32
+
+    def __init__(self):
+        self._bands: Counter = Counter()
+        self._size: int = 0
+        self._root: Optional[IntervalNode] = None
+        self._indexed: int = 0
+        self._pending: List[Band] = []
+        self._removed: Counter = Counter()
+        self._removed_count: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, low: float, high: float, subscriber: "SubscriberInterface"):
+        if low > high:
+            raise ValueError(f"Invalid price band: {low} > {high}")
+        band: Band = (low, high, subscriber)
+        self._bands[band] += 1
+        self._size += 1
+        self._pending.append(band)
+
+    def remove(self, low: float, high: float, subscriber: "SubscriberInterface"):
+        band: Band = (low, high, subscriber)
+        if not self._bands[band]:
+            raise ValueError(
+                f"The subscriber is not subscribed to band [{low}, {high}]"
+            )
+        self._bands[band] -= 1
+        if not self._bands[band]:
+            del self._bands[band]
+        self._size -= 1
+        if band in self._pending:
+            self._pending.remove(band)
+        else:
+            self._removed[band] += 1
+            self._removed_count += 1
+
+    def stab(self, price: float) -> List["SubscriberInterface"]:
+        """
+        Returns the subscribers whose band contains the price.
+        """
+        changes: int = len(self._pending) + self._removed_count
+        if changes > max(self.min_changes_before_rebuild, math.isqrt(self._indexed)):
+            self._rebuild()
+
+        bands: List[Band] = []
+        node: Optional[IntervalNode] = self._root
+        while node is not None:
+            if price < node.center:
+                for band in node.by_low:
+                    if band[0] > price:
+                        break
+                    bands.append(band)
+                node = node.left
+            elif price > node.center:
+                for band in node.by_high:
+                    if band[1] < price:
+                        break
+                    bands.append(band)
+                node = node.right
+            else:
+                bands.extend(node.by_low)
+                break
+
+        if self._removed:
+            removed: Counter = Counter(self._removed)
+            bands = [band for band in bands if not _take(removed, band)]
+        subscribers: List["SubscriberInterface"] = [band[2] for band in bands]
+        subscribers.extend(
+            band[2] for band in self._pending if band[0] <= price <= band[1]
+        )
+        return subscribers
+
+    def _rebuild(self):
+        bands: List[Band] = list(self._bands.elements())
+        self._root = IntervalNode(bands) if bands else None
+        self._indexed = len(bands)
+        self._pending.clear()
+        self._removed.clear()
+        self._removed_count = 0
+
+
+def _take(counter: Counter, band: Band) -> bool:
+    """
+    Decrements the count of the band and returns True if it was positive.
+    """
+    if counter[band]:
+        counter[band] -= 1
+        return True
+    return False
+
+
+class ThresholdIndex:
+    """
+    Crossing subscriptions of one ticker kept sorted by the threshold.
+    A price move from old to new crosses the thresholds t
+    with min(old, new) < t <= max(old, new), which are found with bisect.
+    """
+
+    def __init__(self):
+        self._thresholds: List[float] = []
+        self._subscribers: List["SubscriberInterface"] = []
+
+    def __len__(self) -> int:
+        return len(self._thresholds)
+
+    def add(self, threshold: float, subscriber: "SubscriberInterface"):
+        position: int = bisect_right(self._thresholds, threshold)
+        self._thresholds.insert(position, threshold)
+        self._subscribers.insert(position, subscriber)
+
+    def remove(self, threshold: float, subscriber: "SubscriberInterface"):
+        position: int = bisect_left(self._thresholds, threshold)
+        while (
+            position < len(self._thresholds) and self._thresholds[position] == threshold
+        ):
+            if self._subscribers[position] is subscriber:
+                del self._thresholds[position]
+                del self._subscribers[position]
+                return
+            position += 1
+        raise ValueError(f"The subscriber is not subscribed to crossing {threshold}")
+
+    def crossed(
+        self, old_price: float, new_price: float
+    ) -> List["SubscriberInterface"]:
+        """
+        Returns the subscribers whose threshold the price has crossed.
+        """
+        low, high = min(old_price, new_price), max(old_price, new_price)
+        return self._subscribers[
+            bisect_right(self._thresholds, low) : bisect_right(self._thresholds, high)
+        ]
@@ -0,0 +1,229 @@
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from behavioral.observer.observer import SubscriberInterface
+
+# the header is the global change counter, every slot is (sequence, price, updated_at)
+HEADER_WORDS: int = 1
+SLOT_WORDS: int = 3
+WORD_SIZE: int = 8
+
+
+class SharedTickerTable:
+    """
+    A table of the latest ticker prices in shared memory,
+    which processes read without sending prices through pipes.
+    Every slot is guarded by a seqlock: the writer makes the sequence odd,
+    writes the price and makes it even again, a reader retries
+    if the sequence was odd or changed while it was reading.
+    Readers never block the writer. After every publish a global change counter
+    is increased and waiting readers are woken up by a condition.
+    The table has one writer process, it is passed to reader processes
+    as an argument of the process.
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        memory: shared_memory.SharedMemory,
+        condition,
+        owner_pid: Optional[int],
+    ):
+        self._tickers = list(tickers)
+        self._slots: Dict[str, int] = {
+            ticker: HEADER_WORDS + SLOT_WORDS * i
+            for i, ticker in enumerate(self._tickers)
+        }
+        self._memory = memory
+        self._condition = condition
+        # only the creating process unlinks the memory, also in forked readers
+        self._owner_pid = owner_pid
+        # two views of the same memory:
+        # sequences and counters as integers, prices as floats
+        self._words = memory.buf.cast("Q")
+        self._floats = memory.buf.cast("d")
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def create(cls, prices: Dict[str, float], context=None) -> "SharedTickerTable":
+        """
+        Creates a table with the initial prices of the tickers.
+        The change signal is created in the multiprocessing context
+        the reader processes will be started in.
+        """
+        context = context or multiprocessing.get_context()
+        size: int = (HEADER_WORDS + SLOT_WORDS * len(prices)) * WORD_SIZE
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        table = cls(list(prices), memory, context.Condition(), owner_pid=os.getpid())
+        table._words[0] = 0
+        for ticker, price in prices.items():
+            slot: int = table._slots[ticker]
+            table._words[slot] = 0
+            table._floats[slot + 1] = price
+            table._floats[slot + 2] = time.monotonic()
+        return table
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self._tickers)
+
+    @property
+    def version(self) -> int:
+        """
+        Returns the global change counter.
+        """
+        return self._words[0]
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._slots
+
+    def publish(self, ticker: str, price: float):
+        self.publish_many({ticker: price})
+
+    def publish_many(self, prices: Dict[str, float]):
+        """
+        Writes the prices and wakes up the waiting readers once.
+        """
+        updated_at: float = time.monotonic()
+        with self._write_lock:
+            for ticker, price in prices.items():
+                slot: int = self._slot_of(ticker)
+                self._words[slot] += 1
+                self._floats[slot + 1] = price
+                self._floats[slot + 2] = updated_at
+                self._words[slot] += 1
+            self._words[0] += 1
+        with self._condition:
+            self._condition.notify_all()
+
+    def read(self, ticker: str) -> float:
+        return self.read_slot(ticker)[0]
+
+    def read_slot(self, ticker: str) -> Tuple[float, float, int]:
+        """
+        Returns the price, the time.monotonic() of its update
+        and the sequence of the ticker slot.
+        """
+        slot: int = self._slot_of(ticker)
+        words = self._words
+        floats = self._floats
+        while True:
+            sequence: int = words[slot]
+            if sequence & 1:
+                # the writer is in the middle of an update
+                continue
+            price: float = floats[slot + 1]
+            updated_at: float = floats[slot + 2]
+            if words[slot] == sequence:
+                return price, updated_at, sequence
+
+    def read_changed(self, seen: Dict[str, int]) -> Dict[str, float]:
+        """
+        Returns the prices of the tickers updated since the sequences
+        in seen, and remembers the new sequences in it.
+        """
+        prices: Dict[str, float] = {}
+        for ticker, slot in self._slots.items():
+            if self._words[slot] == seen.get(ticker):
+                continue
+            price, _, sequence = self.read_slot(ticker)
+            seen[ticker] = sequence
+            prices[ticker] = price
+        return prices
+
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """
+        Waits until the change counter differs from the version
+        and returns the new counter. Returns the same version on timeout.
+        """
+        if self._words[0] != version:
+            return self._words[0]
+        with self._condition:
+            self._condition.wait_for(lambda: self._words[0] != version, timeout)
+        return self._words[0]
+
+    def close(self):
+        self._words.release()
+        self._floats.release()
+        self._memory.close()
+        if self._owner_pid == os.getpid():
+            self._memory.unlink()
+
+    def _slot_of(self, ticker: str) -> int:
+        slot: Optional[int] = self._slots.get(ticker)
+        if slot is None:
+            raise ValueError(f"Invalid ticker name: {ticker}")
+        return slot
+
+    def __getstate__(self) -> dict:
+        return {
+            "tickers": self._tickers,
+            "name": self._memory.name,
+            "condition": self._condition,
+        }
+
+    def __setstate__(self, state: dict):
+        # a reader process attaches to the memory of the writer
+        self.__init__(
+            state["tickers"],
+            shared_memory.SharedMemory(name=state["name"]),
+            state["condition"],
+            owner_pid=None,
+        )
+
+
+def run_subscriber(
+    table: SharedTickerTable,
+    subscriber: "SubscriberInterface",
+    stop_event,
+    poll_interval: float = 0.1,
+):
+    """
+    Notifies the subscriber about the price changes in the table
+    until the stop event is set. Runs in a subscriber process.
+    """
+    seen: Dict[str, int] = {}
+    # the version is taken first, so an update during the read is not missed
+    version: int = table.version
+    table.read_changed(seen)
+    while not stop_event.is_set():
+        new_version: int = table.wait_for_change(version, timeout=poll_interval)
+        if new_version == version:
+            continue
+        version = new_version
+        prices: Dict[str, float] = table.read_changed(seen)
+        if prices:
+            subscriber.notify_many(prices)
+
+
+if __name__ == "__main__":
+    # client code
+    from behavioral.observer.observer import BeginnerInvestor, Exchange
+
+    def subscriber_process(table: SharedTickerTable, stop_event):
+        try:
+            run_subscriber(table, BeginnerInvestor(), stop_event)
+        finally:
+            table.close()
+
+    shared_table = SharedTickerTable.create({"AAPL": 100.12, "AMZN": 321.23})
+    exchange = Exchange(shared_table=shared_table)
+    stop = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=subscriber_process, args=(shared_table, stop)
+    )
+    process.start()
+    time.sleep(0.5)
+    for new_price in (101.0, 102.5, 99.9):
+        exchange.update_ticker_price("AAPL", new_price)
+        time.sleep(0.1)
+    exchange.update_ticker_prices({"AAPL": 100.5, "AMZN": 330.0})
+    time.sleep(0.1)
+    stop.set()
+    process.join()
+    shared_table.close()
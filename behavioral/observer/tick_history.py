@@ -0,0 +1,202 @@
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class TickRingBuffer:
+    """
+    A fixed-size history of (timestamp, price, volume) ticks of one ticker.
+    Every tick is written twice, at i and at i + capacity, so the last
+    n ticks are always a contiguous slice of the arrays: windows are views,
+    and the indicators are computed by NumPy without copying or Python loops.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._capacity = capacity
+        self._timestamps = np.zeros(2 * capacity)
+        self._prices = np.zeros(2 * capacity)
+        self._volumes = np.zeros(2 * capacity)
+        self._next: int = 0  # the position of the next tick in [0, capacity)
+        self._count: int = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(
+        self, price: float, volume: float = 1.0, timestamp: Optional[float] = None
+    ):
+        timestamp = time.time() if timestamp is None else timestamp
+        for position in (self._next, self._next + self._capacity):
+            self._timestamps[position] = timestamp
+            self._prices[position] = price
+            self._volumes[position] = volume
+        self._next = (self._next + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def extend(
+        self,
+        prices: Sequence[float],
+        volumes: Optional[Sequence[float]] = None,
+        timestamps: Optional[Sequence[float]] = None,
+    ):
+        """
+        Appends many ticks at once.
+        """
+        prices = np.asarray(prices, dtype=float)[-self._capacity :]
+        size: int = len(prices)
+        if not size:
+            return
+        volumes = (
+            np.ones(size)
+            if volumes is None
+            else np.asarray(volumes, dtype=float)[-size:]
+        )
+        timestamps = (
+            np.full(size, time.time())
+            if timestamps is None
+            else np.asarray(timestamps, dtype=float)[-size:]
+        )
+        positions = (self._next + np.arange(size)) % self._capacity
+        for offset in (0, self._capacity):
+            self._timestamps[positions + offset] = timestamps
+            self._prices[positions + offset] = prices
+            self._volumes[positions + offset] = volumes
+        self._next = (self._next + size) % self._capacity
+        self._count = min(self._count + size, self._capacity)
+
+    def timestamps(self, window: Optional[int] = None) -> np.ndarray:
+        return self._window(self._timestamps, window)
+
+    def prices(self, window: Optional[int] = None) -> np.ndarray:
+        """
+        Returns a read-only view of the last window prices, the oldest first.
+        """
+        return self._window(self._prices, window)
+
+    def volumes(self, window: Optional[int] = None) -> np.ndarray:
+        return self._window(self._volumes, window)
+
+    def moving_average(self, window: Optional[int] = None) -> float:
+        return float(self.prices(window).mean())
+
+    def vwap(self, window: Optional[int] = None) -> float:
+        """
+        Returns the volume weighted average price.
+        """
+        volumes: np.ndarray = self.volumes(window)
+        return float(np.dot(self.prices(window), volumes) / volumes.sum())
+
+    def min_max(self, window: Optional[int] = None) -> Tuple[float, float]:
+        prices: np.ndarray = self.prices(window)
+        return float(prices.min()), float(prices.max())
+
+    def returns(self, window: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the simple returns of the last window ticks.
+        """
+        window = self._count - 1 if window is None else min(window, self._count - 1)
+        prices: np.ndarray = self.prices(window + 1)
+        return np.diff(prices) / prices[:-1]
+
+    def _window(self, column: np.ndarray, window: Optional[int]) -> np.ndarray:
+        if not self._count:
+            raise ValueError("The history is empty")
+        window = self._count if window is None else min(window, self._count)
+        if window <= 0:
+            raise ValueError("window must be positive")
+        end: int = self._next + self._capacity
+        view: np.ndarray = column[end - window : end]
+        view.flags.writeable = False
+        return view
+
+
+class TickHistory:
+    """
+    Keeps a tick ring buffer of every ticker.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self._capacity = capacity
+        self._buffers: Dict[str, TickRingBuffer] = defaultdict(
+            lambda: TickRingBuffer(self._capacity)
+        )
+
+    def __getitem__(self, ticker: str) -> TickRingBuffer:
+        if ticker not in self._buffers:
+            raise KeyError(ticker)
+        return self._buffers[ticker]
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._buffers
+
+    def record(
+        self,
+        ticker: str,
+        price: float,
+        volume: float = 1.0,
+        timestamp: Optional[float] = None,
+    ):
+        self._buffers[ticker].append(price, volume, timestamp)
+
+    def record_many(
+        self, ticks: Sequence[Tuple[str, float]], timestamp: Optional[float] = None
+    ):
+        """
+        Records a batch of (ticker, price) ticks with one timestamp,
+        appending the ticks of every ticker at once.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        ticker_prices: Dict[str, list] = defaultdict(list)
+        for ticker, price in ticks:
+            ticker_prices[ticker].append(price)
+        for ticker, prices in ticker_prices.items():
+            self._buffers[ticker].extend(
+                prices, timestamps=np.full(len(prices), timestamp)
+            )
+
+
+if __name__ == "__main__":
+    # client code
+    from behavioral.observer.observer import Exchange, SubscriberInterface
+
+    class TrendInvestor(SubscriberInterface):
+        """
+        Buys when the price is above its moving average.
+        """
+
+        def __init__(self, history: TickHistory):
+            self._history = history
+
+        def notify(self, ticker: str, price: float):
+            ticks: TickRingBuffer = self._history[ticker]
+            average: float = ticks.moving_average(5)
+            low, high = ticks.min_max(5)
+            action: str = "Buy" if price > average else "Wait"
+            print(
+                f"{ticker} {price:.2f}: average {average:.2f},"
+                f" range {low:.2f}..{high:.2f}. {action}."
+            )
+
+    tick_history = TickHistory(capacity=256)
+    exchange = Exchange(history=tick_history)
+    exchange.add_subscriber("AAPL", TrendInvestor(tick_history))
+    for new_price, new_volume in [
+        (101.0, 10),
+        (102.5, 5),
+        (101.8, 20),
+        (99.9, 40),
+        (103.2, 5),
+    ]:
+        exchange.update_ticker_price("AAPL", new_price, new_volume)
+    print(
+        f"AAPL VWAP {tick_history['AAPL'].vwap():.2f},"
+        f" returns {tick_history['AAPL'].returns()}"
+    )
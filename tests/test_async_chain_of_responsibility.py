@@ -0,0 +1,82 @@
+import asyncio
+import pickle
+import time
+import unittest
+
+from behavioral.chain_of_responsibility.async_chain_of_responsibility import (
+    AsyncBaseHandler,
+    SlowUserLookupHandler,
+    validate_chain,
+)
+from behavioral.chain_of_responsibility.chain_of_responsibility import (
+    ADMIN_GROUP_NAME,
+    AuthorizationHandler,
+    PayloadHandler,
+)
+from behavioral.chain_of_responsibility.exceptions import InvalidRequestError
+from behavioral.chain_of_responsibility.pipeline import HandlerPipeline
+from behavioral.chain_of_responsibility.request import Request
+
+
+def build_request(blocked: bool = False) -> Request:
+    token: bytes = pickle.dumps(
+        {"name": "Aleksei", "group": ADMIN_GROUP_NAME, "blocked": blocked}
+    )
+    return Request(headers={"Authorization": token}, body={"name": "Aleksei"})
+
+
+def build_chain(delay: float, lookups: int = 3) -> AuthorizationHandler:
+    auth_handler = AuthorizationHandler()
+    handler = auth_handler
+    for _ in range(lookups):
+        lookup_handler = SlowUserLookupHandler(delay)
+        handler.set_next_handler(lookup_handler)
+        handler = lookup_handler
+    handler.set_next_handler(PayloadHandler())
+    return auth_handler
+
+
+class RejectingAsyncHandler(AsyncBaseHandler):
+    """
+    Overrides validate instead of check.
+    """
+
+    async def validate(self, request: Request):
+        raise InvalidRequestError("Rejected by validate")
+
+
+class ValidateChainTest(unittest.TestCase):
+    def test_independent_handlers_run_concurrently(self):
+        delay: float = 0.2
+        started_at: float = time.perf_counter()
+        asyncio.run(validate_chain(build_chain(delay), build_request()))
+        elapsed: float = time.perf_counter() - started_at
+        self.assertGreaterEqual(elapsed, delay)
+        self.assertLess(elapsed, 2 * delay)
+
+    def test_rejects_blocked_user(self):
+        with self.assertRaises(InvalidRequestError):
+            asyncio.run(validate_chain(build_chain(0.01), build_request(blocked=True)))
+
+    def test_async_handler_overriding_validate_is_called(self):
+        for independent in (False, True):
+            auth_handler = AuthorizationHandler()
+            auth_handler.set_next_handler(RejectingAsyncHandler(independent))
+            with self.assertRaises(InvalidRequestError):
+                asyncio.run(validate_chain(auth_handler, build_request()))
+
+    def test_sync_validate_refuses_async_handlers(self):
+        with self.assertRaises(TypeError):
+            build_chain(0.01).validate(build_request(blocked=True))
+
+    def test_sync_validate_many_refuses_async_handlers(self):
+        with self.assertRaises(TypeError):
+            build_chain(0.01).validate_many([build_request(blocked=True)])
+
+    def test_pipeline_refuses_async_handlers(self):
+        with self.assertRaises(TypeError):
+            HandlerPipeline.from_chain(build_chain(0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
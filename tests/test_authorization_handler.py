@@ -0,0 +1,73 @@
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from behavioral.chain_of_responsibility.chain_of_responsibility import (
+    ADMIN_GROUP_NAME,
+    AuthorizationHandler,
+    PayloadHandler,
+    UserGroupHandler,
+)
+from behavioral.chain_of_responsibility.exceptions import InvalidRequestError
+from behavioral.chain_of_responsibility.request import Request
+from behavioral.chain_of_responsibility.token_cache import TokenCache
+
+TOKENS = [
+    pickle.dumps({"name": "Aleksei", "group": ADMIN_GROUP_NAME}),
+    pickle.dumps({"name": "John", "group": "user"}),
+    pickle.dumps(None),
+    pickle.dumps({"name": "Aleksei", "group": ADMIN_GROUP_NAME})[:-3],
+    b"not a token",
+    b"",
+]
+
+
+def build_chain(**auth_options) -> AuthorizationHandler:
+    auth_handler = AuthorizationHandler(**auth_options)
+    group_handler = UserGroupHandler()
+    auth_handler.set_next_handler(group_handler)
+    group_handler.set_next_handler(PayloadHandler())
+    return auth_handler
+
+
+def build_requests():
+    return [
+        Request(headers={"Authorization": token}, body={"name": "Aleksei"})
+        for token in TOKENS * 5
+    ]
+
+
+def messages(errors):
+    return [None if error is None else str(error) for error in errors]
+
+
+class AuthorizationHandlerBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = []
+        for request in build_requests():
+            try:
+                build_chain().validate(request)
+            except InvalidRequestError as e:
+                self.expected.append(str(e))
+                continue
+            self.expected.append(None)
+
+    def test_serial_batch_matches_validate(self):
+        errors = build_chain().validate_many(build_requests())
+        self.assertEqual(messages(errors), self.expected)
+
+    def test_process_pool_batch_matches_validate(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            for token_cache in (None, TokenCache()):
+                chain = build_chain(
+                    token_cache=token_cache,
+                    decode_executor=executor,
+                    parallel_decode_min_batch=1,
+                    decode_chunksize=2,
+                )
+                errors = chain.validate_many(build_requests())
+                self.assertEqual(messages(errors), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from behavioral.command.carrier import Carrier
+from behavioral.command.carrier_store import CarrierStore
+from behavioral.command.command import SaveCarriersToStoreCommand, Transaction
+
+
+class CarrierStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = CarrierStore(capacity=2)
+
+    def test_add_and_overwrite(self):
+        carrier = self.store.add("John", "Doe", 12.32, 54.21, carrier_id="1")
+        self.assertEqual(
+            (carrier.name, carrier.surname, carrier.latitude, carrier.longitude),
+            ("John", "Doe", 12.32, 54.21),
+        )
+        self.store.add("Jane", "Roe", 1.0, 2.0, carrier_id="1")
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual((carrier.name, carrier.latitude), ("Jane", 1.0))
+
+    def test_delete_moves_the_last_row(self):
+        for i in range(5):
+            self.store.add(f"name {i}", "Doe", float(i), float(i), carrier_id=str(i))
+        last = self.store.get("4")
+        self.store.delete("1")
+        self.assertNotIn("1", self.store)
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual((last.name, last.latitude), ("name 4", 4.0))
+        self.store.delete("4")
+        self.assertEqual(sorted(self.store.within_box(-1, -1, 10, 10)), ["0", "2", "3"])
+        with self.assertRaises(KeyError):
+            self.store.get("4")
+
+    def test_within_box_matches_brute_force(self):
+        generator = random.Random(0)
+        positions = {}
+        for i in range(5000):
+            positions[str(i)] = (
+                generator.uniform(-60, 60),
+                generator.uniform(-180, 180),
+            )
+            self.store.add("John", "Doe", *positions[str(i)], carrier_id=str(i))
+        for carrier_id in generator.sample(sorted(positions), 1000):
+            del positions[carrier_id]
+            self.store.delete(carrier_id)
+        for _ in range(50):
+            latitude, longitude = generator.uniform(-60, 60), generator.uniform(
+                -180, 180
+            )
+            box = (latitude - 10, longitude - 20, latitude + 10, longitude + 20)
+            expected = {
+                carrier_id
+                for carrier_id, (lat, lon) in positions.items()
+                if box[0] <= lat <= box[2] and box[1] <= lon <= box[3]
+            }
+            self.assertEqual(set(self.store.within_box(*box)), expected)
+
+    def test_save_command_is_undone(self):
+        carriers = [Carrier("John", "Doe", 12.32, 54.21 + i) for i in range(3)]
+
+        class FailingCommand(SaveCarriersToStoreCommand):
+            def execute(self):
+                raise RuntimeError("failed")
+
+        transaction = Transaction(coalesce_writes=False)
+        transaction.register_command(SaveCarriersToStoreCommand(self.store, carriers))
+        transaction.register_command(FailingCommand(self.store, []))
+        transaction.execute()
+        self.assertEqual(len(self.store), 0)
+
+        SaveCarriersToStoreCommand(self.store, carriers).execute()
+        self.assertEqual(self.store.get(carriers[2].carrier_id).longitude, 56.21)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import random
+import threading
+import unittest
+from typing import List, Set
+
+from behavioral.mediator.concurrent_mediator import (
+    ConcurrentParkingAssistant,
+    WaitingCar,
+)
+from behavioral.mediator.exceptions import ParkingFullError
+from behavioral.mediator.mediator import ParkingAssistant
+
+
+class ConcurrentParkingAssistantTest(unittest.TestCase):
+    def test_threads_never_share_a_position(self):
+        parking_assistant = ConcurrentParkingAssistant(ParkingAssistant(50))
+        occupied: Set[int] = set()
+        occupied_lock = threading.Lock()
+        errors: List[str] = []
+
+        def parker():
+            for _ in range(2000):
+                try:
+                    position: int = parking_assistant.get_parking_position()
+                except ParkingFullError:
+                    continue
+                with occupied_lock:
+                    if position in occupied:
+                        errors.append(f"Position {position} was given twice")
+                    occupied.add(position)
+                with occupied_lock:
+                    occupied.remove(position)
+                parking_assistant.release_parking_position(position)
+
+        threads = [threading.Thread(target=parker) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_waiting_cars_park_one_at_a_time(self):
+        capacity: int = 5
+        parking_assistant = ConcurrentParkingAssistant(ParkingAssistant(capacity))
+        occupied: Set[int] = set()
+        parked: List[int] = []
+
+        async def visit(car: WaitingCar):
+            await car.park(timeout=10)
+            self.assertNotIn(car.position, occupied)
+            occupied.add(car.position)
+            parked.append(car.position)
+            await asyncio.sleep(random.uniform(0, 0.01))
+            occupied.remove(car.position)
+            car.leave()
+
+        async def main():
+            cars = [WaitingCar(f"Car {i}", parking_assistant) for i in range(50)]
+            await asyncio.gather(*(visit(car) for car in cars))
+
+        asyncio.run(main())
+        self.assertEqual(len(parked), 50)
+
+    def test_car_gives_up_after_timeout(self):
+        parking_assistant = ConcurrentParkingAssistant(ParkingAssistant(2))
+
+        async def main():
+            cars = [WaitingCar(f"Car {i}", parking_assistant) for i in range(2)]
+            await asyncio.gather(*(car.park() for car in cars))
+            await WaitingCar("Impatient car", parking_assistant).park(timeout=0.01)
+
+        with self.assertRaises(ParkingFullError):
+            asyncio.run(main())
+
+    def test_invalid_release_is_not_handed_to_a_waiting_car(self):
+        parking_assistant = ConcurrentParkingAssistant(ParkingAssistant(1))
+
+        async def main():
+            position: int = parking_assistant.get_parking_position()
+            waiting = asyncio.ensure_future(
+                parking_assistant.wait_for_parking_position(timeout=1)
+            )
+            await asyncio.sleep(0)
+            with self.assertRaises(ValueError):
+                parking_assistant.release_parking_position(position + 1)
+            self.assertFalse(waiting.done())
+            parking_assistant.release_parking_position(position)
+            self.assertEqual(await waiting, position)
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import time
+import unittest
+from typing import List, Tuple
+
+from behavioral.command.command import CommandInterface, ConcurrentTransaction
+
+
+class RecordingCommand(CommandInterface):
+    """
+    Records its executions and undos in a shared log.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        log: List[Tuple[str, str]],
+        delay: float = 0.0,
+        fail: bool = False,
+    ):
+        self.name = name
+        self._log = log
+        self._delay = delay
+        self._fail = fail
+
+    def execute(self):
+        time.sleep(self._delay)
+        if self._fail:
+            raise RuntimeError(f"{self.name} failed")
+        self._log.append(("execute", self.name))
+
+    def undo(self):
+        time.sleep(self._delay)
+        self._log.append(("undo", self.name))
+
+
+class ConcurrentTransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.log: List[Tuple[str, str]] = []
+        self.transaction = ConcurrentTransaction(max_workers=4)
+
+    def add(self, name: str, depends_on=(), **options) -> RecordingCommand:
+        command = RecordingCommand(name, self.log, **options)
+        self.transaction.register_command(command, depends_on=depends_on)
+        return command
+
+    def position(self, action: str, name: str) -> int:
+        return self.log.index((action, name))
+
+    def test_commands_run_after_their_dependencies(self):
+        first = self.add("first")
+        left = self.add("left", [first], delay=0.05)
+        right = self.add("right", [first], delay=0.01)
+        self.add("last", [left, right])
+
+        self.transaction.execute()
+
+        self.assertEqual(len(self.log), 4)
+        self.assertEqual(self.log[0], ("execute", "first"))
+        self.assertEqual(self.log[-1], ("execute", "last"))
+        # independent commands run concurrently: the faster one finishes first
+        self.assertLess(
+            self.position("execute", "right"), self.position("execute", "left")
+        )
+
+    def test_failure_skips_pending_commands(self):
+        first = self.add("first")
+        failing = self.add("failing", [first], fail=True)
+        self.add("after_failing", [failing])
+        slow = self.add("slow", [first], delay=0.05)
+        self.add("after_slow", [slow])
+
+        self.transaction.execute()
+
+        executed = {name for action, name in self.log if action == "execute"}
+        self.assertEqual(executed, {"first", "slow"})
+        self.assertNotIn(("undo", "failing"), self.log)
+
+    def test_undo_runs_in_reverse_dependency_order(self):
+        first = self.add("first", delay=0.01)
+        second = self.add("second", [first], delay=0.01)
+        third = self.add("third", [second])
+        independent = self.add("independent", delay=0.03)
+        self.add("failing", [third, independent], fail=True)
+
+        self.transaction.execute()
+
+        undone = [name for action, name in self.log if action == "undo"]
+        self.assertEqual(set(undone), {"first", "second", "third", "independent"})
+        self.assertLess(self.position("undo", "third"), self.position("undo", "second"))
+        self.assertLess(self.position("undo", "second"), self.position("undo", "first"))
+        for name in ("first", "second", "third", "independent"):
+            self.assertLess(self.position("execute", name), self.position("undo", name))
+
+    def test_dependency_must_be_registered(self):
+        with self.assertRaises(ValueError):
+            self.add("orphan", [RecordingCommand("unregistered", self.log)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import threading
+import unittest
+
+from behavioral.observer.dispatcher import BLOCK, QueuedDispatcher
+from behavioral.observer.observer import Exchange, SubscriberInterface
+
+
+class RecordingSubscriber(SubscriberInterface):
+    def __init__(self):
+        self.prices = []
+
+    def notify(self, ticker: str, price: float):
+        self.prices.append((ticker, price))
+
+
+class QueuedDispatcherTest(unittest.TestCase):
+    def test_blocking_batch_larger_than_the_queue(self):
+        dispatcher = QueuedDispatcher(
+            max_queue_size=2, overflow_policy=BLOCK, workers=1
+        )
+        exchange = Exchange(
+            tickers={"AAPL": 100.0, "AMZN": 321.0, "GOOGL": 1200.0},
+            dispatcher=dispatcher,
+        )
+        subscriber = RecordingSubscriber()
+        new_prices = {"AAPL": 101.0, "AMZN": 322.0, "GOOGL": 1201.0}
+        for ticker in new_prices:
+            exchange.add_subscriber(ticker, subscriber)
+
+        publisher = threading.Thread(
+            target=exchange.update_ticker_prices, args=(new_prices,), daemon=True
+        )
+        publisher.start()
+        publisher.join(timeout=5)
+
+        self.assertFalse(publisher.is_alive(), "the publisher is blocked")
+        self.assertTrue(dispatcher.flush(timeout=5))
+        self.assertEqual(subscriber.prices, list(new_prices.items()))
+        dispatcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import unittest
+import uuid
+
+from behavioral.memento.db_models import DB, User
+from behavioral.memento.history import ModelHistory, SnapshotManager
+
+
+class ModelHistoryTest(unittest.TestCase):
+    def test_state_at_matches_brute_force(self):
+        generator = random.Random(0)
+        for capacity in (1, 2, 5, 16):
+            for keyframe_interval in (1, 3, 4, 100):
+                user = User(str(uuid.uuid4()), "Bob", "bob_pass", 100)
+                history = ModelHistory(user, capacity, keyframe_interval)
+                states = []
+                for version in range(60):
+                    if generator.random() < 0.7:
+                        user.balance = generator.randint(0, 5)
+                    if generator.random() < 0.2:
+                        user.username = generator.choice(["Bob", "Robert"])
+                    states.append(user.get_state())
+                    self.assertEqual(history.push(), version)
+
+                    kept = range(history.oldest_version, version + 1)
+                    self.assertEqual(len(history), len(kept))
+                    self.assertEqual(len(kept), min(capacity, version + 1))
+                    for kept_version in kept:
+                        self.assertEqual(
+                            history.state_at(kept_version),
+                            states[kept_version],
+                            (capacity, keyframe_interval, version, kept_version),
+                        )
+
+    def test_dropped_versions_are_refused(self):
+        user = User(str(uuid.uuid4()), "Bob", "bob_pass", 100)
+        history = ModelHistory(user, capacity=2)
+        self.assertIsNone(history.latest_version)
+        for _ in range(3):
+            history.push()
+        for version in (0, 3):
+            with self.assertRaises(ValueError):
+                history.state_at(version)
+
+    def test_restore(self):
+        bob = User(str(uuid.uuid4()), "Bob", "bob_pass", 100)
+        bob.save()
+        snapshot_manager = SnapshotManager(capacity=4, keyframe_interval=2)
+        first_version: int = snapshot_manager.push(bob)
+        bob.update(balance=50, username="Robert")
+        snapshot_manager.push(bob)
+
+        snapshot_manager.restore(bob, first_version)
+
+        self.assertEqual(bob.get_state(), {"balance": 100, "username": "Bob"})
+        self.assertEqual(DB[bob.user_id]["balance"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import pickle
+import unittest
+
+from behavioral.chain_of_responsibility.chain_of_responsibility import (
+    ADMIN_GROUP_NAME,
+    AuthorizationHandler,
+    PayloadHandler,
+    UserGroupHandler,
+)
+from behavioral.chain_of_responsibility.instrumentation import ChainInstrumentation
+from behavioral.chain_of_responsibility.request import Request
+
+
+def build_request() -> Request:
+    token: bytes = pickle.dumps({"name": "Aleksei", "group": ADMIN_GROUP_NAME})
+    return Request(headers={"Authorization": token}, body={"name": "Aleksei"})
+
+
+class ChainInstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.group_handler = UserGroupHandler()
+        self.group_handler.set_next_handler(PayloadHandler())
+        self.auth_handler = AuthorizationHandler()
+        self.auth_handler.set_next_handler(self.group_handler)
+
+    def test_counts_every_check_once(self):
+        instrumentation = ChainInstrumentation()
+        instrumentation.attach(self.auth_handler)
+        instrumentation.attach(self.auth_handler)
+        for _ in range(3):
+            self.auth_handler.validate(build_request())
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual([stats["calls"] for stats in snapshot.values()], [3, 3, 3])
+        instrumentation.detach()
+
+    def test_detach_restores_shared_handlers(self):
+        other_head = AuthorizationHandler()
+        other_head.set_next_handler(self.group_handler)
+        instrumentation = ChainInstrumentation()
+        instrumentation.attach(self.auth_handler)
+        instrumentation.attach(other_head)
+        instrumentation.detach()
+        instrumentation.detach()
+        for handler in (self.auth_handler, other_head, self.group_handler):
+            self.assertNotIn("check", vars(handler))
+        self.auth_handler.validate(build_request())
+
+    def test_detach_keeps_wrappers_of_another_instrumentation(self):
+        first, second = ChainInstrumentation(), ChainInstrumentation()
+        first.attach(self.auth_handler)
+        second.attach(self.auth_handler)
+        second.detach()
+        self.auth_handler.validate(build_request())
+        self.assertEqual(
+            [stats["calls"] for stats in first.snapshot().values()], [1, 1, 1]
+        )
+        first.detach()
+
+
+if __name__ == "__main__":
+    unittest.main()
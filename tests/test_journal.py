@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import unittest
+import uuid
+from typing import List
+
+from behavioral.command.carrier import DB as CARRIERS_DB
+from behavioral.command.carrier import Carrier
+from behavioral.command.command import SaveCarrierCommand
+from behavioral.command.command import Transaction as CarrierTransaction
+from behavioral.journal import COMMIT, TransactionJournal
+from behavioral.memento.db_models import DB, UnitOfWork, User
+from behavioral.memento.memento import UNDO_ACTIONS, Transaction, UpdateBalanceCommand
+
+
+class FailingJournal(TransactionJournal):
+    """
+    Fails to write the batch which contains a record of the given type.
+    """
+
+    def __init__(self, path: str, fail_on: str, group_commit: bool = True):
+        super(FailingJournal, self).__init__(path, group_commit=group_commit)
+        self._fail_on = f'"type": "{fail_on}"'.encode("utf-8")
+
+    def _write(self, batch: List[bytes]):
+        if any(self._fail_on in line for line in batch):
+            raise OSError("No space left on device")
+        super(FailingJournal, self)._write(batch)
+
+
+class TransactionJournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path: str = os.path.join(directory.name, "journal.log")
+
+    def create_user(self, balance: float) -> User:
+        user = User(str(uuid.uuid4()), "Bob", "bob_pass", balance)
+        user.save()
+        return user
+
+    def test_recover_rolls_back_a_crashed_transaction(self):
+        user = self.create_user(100)
+        committed_user = self.create_user(100)
+        journal = TransactionJournal(self.path)
+
+        committed = Transaction(journal=journal)
+        committed.register_command(UpdateBalanceCommand(committed_user, 50))
+        committed.execute()
+
+        crashed = Transaction(journal=journal)
+        crashed.run(UpdateBalanceCommand(user, 70))
+        crashed.run(UpdateBalanceCommand(user, 40))
+        # the process crashes before the commit
+        journal.close()
+
+        journal = TransactionJournal(self.path)
+        self.assertEqual(len(journal.recover(UNDO_ACTIONS)), 1)
+        self.assertEqual(DB[user.user_id]["balance"], 100)
+        self.assertEqual(DB[committed_user.user_id]["balance"], 50)
+        # the rolled back transaction is not rolled back again
+        self.assertEqual(journal.recover(UNDO_ACTIONS), [])
+        journal.close()
+
+    def test_group_commit_shares_fsyncs(self):
+        journal = TransactionJournal(self.path)
+        threads = [
+            threading.Thread(
+                target=lambda: [
+                    journal.append({"transaction_id": None, "type": "test"})
+                    for _ in range(50)
+                ]
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        journal.close()
+
+        with open(self.path, "rb") as journal_file:
+            self.assertEqual(len(journal_file.readlines()), 400)
+        self.assertLess(journal.fsyncs, 400)
+
+    def test_failed_commit_rolls_back_memento_transaction(self):
+        for group_commit in (True, False):
+            user = self.create_user(100)
+            unit_of_work = UnitOfWork()
+            unit_of_work.register(user)
+            journal = FailingJournal(self.path, COMMIT, group_commit=group_commit)
+            transaction = Transaction(journal=journal, unit_of_work=unit_of_work)
+            transaction.register_command(UpdateBalanceCommand(user, 70))
+            transaction.register_command(UpdateBalanceCommand(user, 40))
+            transaction.execute()
+            journal.close()
+
+            self.assertEqual(DB[user.user_id]["balance"], 100)
+            self.assertEqual(User.get(user.user_id).balance, 100)
+
+    def test_failed_commit_rolls_back_carrier_transaction(self):
+        for group_commit in (True, False):
+            carrier = Carrier("John", "Doe", 12.32, 54.21)
+            journal = FailingJournal(self.path, COMMIT, group_commit=group_commit)
+            transaction = CarrierTransaction(journal=journal)
+            transaction.register_command(SaveCarrierCommand(carrier))
+            transaction.execute()
+            journal.close()
+
+            self.assertNotIn(carrier.carrier_id, CARRIERS_DB)
+
+
+if __name__ == "__main__":
+    unittest.main()
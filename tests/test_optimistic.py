@@ -0,0 +1,89 @@
+import random
+import threading
+import unittest
+import uuid
+from typing import List
+
+from behavioral.memento.db_models import DB, DB_WRITE_LOCK, User
+from behavioral.memento.optimistic import (
+    ConflictError,
+    OptimisticTransaction,
+    transfer,
+)
+
+
+def create_users(number_of_users: int, balance: float) -> List[User]:
+    users: List[User] = [
+        User(str(uuid.uuid4()), f"User {i}", "pass", balance)
+        for i in range(number_of_users)
+    ]
+    for user in users:
+        user.save()
+    return users
+
+
+class OptimisticTransactionTest(unittest.TestCase):
+    def test_no_balance_is_lost_by_concurrent_transfers(self):
+        users: List[User] = create_users(5, 1000)
+        user_ids: List[str] = [user.user_id for user in users]
+        total_before: float = sum(DB[user_id]["balance"] for user_id in user_ids)
+
+        def worker(seed: int):
+            generator = random.Random(seed)
+            for _ in range(2000):
+                from_user_id, to_user_id = generator.sample(user_ids, 2)
+                transfer(
+                    from_user_id,
+                    to_user_id,
+                    generator.randint(1, 10),
+                    max_attempts=10_000,
+                )
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total_after: float = sum(DB[user_id]["balance"] for user_id in user_ids)
+        self.assertEqual(total_after, total_before)
+        self.assertEqual(
+            [user.balance for user in users],
+            [DB[user_id]["balance"] for user_id in user_ids],
+        )
+
+    def test_conflicting_commit_writes_nothing(self):
+        bob, alice = create_users(2, 100)
+        first, second = OptimisticTransaction(), OptimisticTransaction()
+        for transaction, amount in ((first, 10), (second, 20)):
+            transaction.read(bob.user_id)
+            transaction.write(alice.user_id, balance=100 + amount)
+            transaction.write(bob.user_id, balance=100 - amount)
+
+        first.commit()
+        with self.assertRaises(ConflictError):
+            second.commit()
+        self.assertEqual(DB[bob.user_id]["balance"], 90)
+        self.assertEqual(DB[alice.user_id]["balance"], 110)
+
+    def test_readers_do_not_wait_for_the_write_lock(self):
+        (bob,) = create_users(1, 100)
+        locked, release = threading.Event(), threading.Event()
+
+        def writer():
+            with DB_WRITE_LOCK:
+                locked.set()
+                release.wait()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        locked.wait()
+        try:
+            self.assertEqual(OptimisticTransaction().read(bob.user_id)["balance"], 100)
+        finally:
+            release.set()
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
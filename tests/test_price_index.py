@@ -0,0 +1,62 @@
+import random
+import unittest
+from collections import Counter
+
+from behavioral.observer.observer import Exchange, SubscriberInterface
+from behavioral.observer.price_index import IntervalIndex
+
+
+class RecordingSubscriber(SubscriberInterface):
+    def __init__(self):
+        self.prices = []
+
+    def notify(self, ticker: str, price: float):
+        self.prices.append((ticker, price))
+
+
+class IntervalIndexTest(unittest.TestCase):
+    def test_stab_matches_brute_force_while_bands_change(self):
+        generator = random.Random(0)
+        index = IntervalIndex()
+        subscribers = [RecordingSubscriber() for _ in range(50)]
+        bands = []
+        for step in range(5000):
+            if bands and generator.random() < 0.4:
+                index.remove(*bands.pop(generator.randrange(len(bands))))
+            else:
+                low: float = generator.uniform(0, 100)
+                band = (
+                    low,
+                    low + generator.uniform(0, 20),
+                    generator.choice(subscribers),
+                )
+                index.add(*band)
+                bands.append(band)
+            price: float = generator.uniform(0, 120)
+            expected = Counter(
+                subscriber for low, high, subscriber in bands if low <= price <= high
+            )
+            self.assertEqual(Counter(index.stab(price)), expected, step)
+        self.assertEqual(len(index), len(bands))
+
+    def test_remove_unknown_band(self):
+        with self.assertRaises(ValueError):
+            IntervalIndex().remove(1.0, 2.0, RecordingSubscriber())
+
+
+class ExchangeSubscriptionsTest(unittest.TestCase):
+    def test_subscriber_is_notified_once_per_tick(self):
+        exchange = Exchange(tickers={"AAPL": 85.0})
+        subscriber = RecordingSubscriber()
+        exchange.add_subscriber("AAPL", subscriber)
+        exchange.add_band_subscriber("AAPL", subscriber, 100.0, 120.0)
+        exchange.add_crossing_subscriber("AAPL", subscriber, 90.0)
+        exchange.add_crossing_subscriber("AAPL", subscriber, 110.0)
+
+        exchange.update_ticker_price("AAPL", 115.0)
+
+        self.assertEqual(subscriber.prices, [("AAPL", 115.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import uuid
+from typing import List
+
+from behavioral.memento.db_models import DB, User
+from behavioral.memento.memento import (
+    CommandInterface,
+    Transaction,
+    UpdateBalanceCommand,
+)
+
+
+class RecordingCommand(CommandInterface):
+    def __init__(self, name: str, log: List[str]):
+        self._name = name
+        self._log = log
+
+    def execute(self):
+        self._log.append(f"execute {self._name}")
+
+    def undo(self):
+        self._log.append(f"undo {self._name}")
+
+
+class SavepointTest(unittest.TestCase):
+    def setUp(self):
+        self.alice = User(str(uuid.uuid4()), "Alice", "alice_pass", 50)
+        self.alice.save()
+        self.log: List[str] = []
+
+    def test_failed_segment_is_retried_without_replaying_the_transaction(self):
+        batch_transaction = Transaction()
+        batch_transaction.run(UpdateBalanceCommand(self.alice, 100))
+        balances_after_failure: List[float] = []
+        for attempt in range(3):
+            try:
+                with batch_transaction.nested() as segment:
+                    segment.run(UpdateBalanceCommand(self.alice, 90))
+                    segment.run(UpdateBalanceCommand(self.alice, 85))
+                    if attempt == 0:
+                        raise RuntimeError("The segment failed")
+            except RuntimeError:
+                balances_after_failure.append(DB[self.alice.user_id]["balance"])
+                continue
+            break
+        batch_transaction.commit()
+
+        self.assertEqual(balances_after_failure, [100])
+        self.assertEqual(DB[self.alice.user_id]["balance"], 85)
+
+    def test_rollback_to_savepoint_undoes_in_reverse_order(self):
+        transaction = Transaction()
+        transaction.run(RecordingCommand("first", self.log))
+        savepoint: int = transaction.savepoint()
+        transaction.run(RecordingCommand("second", self.log))
+        transaction.run(RecordingCommand("third", self.log))
+
+        transaction.rollback_to(savepoint)
+
+        self.assertEqual(
+            self.log,
+            [
+                "execute first",
+                "execute second",
+                "execute third",
+                "undo third",
+                "undo second",
+            ],
+        )
+        with self.assertRaises(ValueError):
+            transaction.rollback_to(savepoint + 1)
+        transaction.rollback()
+        self.assertEqual(self.log[-1], "undo first")
+
+    def test_nested_rollback_keeps_parent_commands(self):
+        transaction = Transaction()
+        transaction.run(RecordingCommand("parent", self.log))
+        nested = transaction.nested()
+        nested.run(RecordingCommand("nested", self.log))
+        inner = nested.nested()
+        inner.run(RecordingCommand("inner", self.log))
+
+        nested.rollback()
+
+        self.assertEqual(self.log[-2:], ["undo inner", "undo nested"])
+        self.assertNotIn("undo parent", self.log)
+        self.assertEqual(transaction.savepoint(), 1)
+
+    def test_nested_transaction_refuses_parent_savepoint(self):
+        transaction = Transaction()
+        parent_savepoint: int = transaction.savepoint()
+        transaction.run(RecordingCommand("parent", self.log))
+        nested = transaction.nested()
+        nested.run(RecordingCommand("nested", self.log))
+
+        with self.assertRaises(ValueError):
+            nested.rollback_to(parent_savepoint)
+        self.assertEqual(transaction.savepoint(), 2)
+
+    def test_committed_nested_commands_are_rolled_back_with_the_parent(self):
+        transaction = Transaction()
+        with transaction.nested() as nested:
+            nested.run(UpdateBalanceCommand(self.alice, 10))
+        transaction.rollback()
+        self.assertEqual(DB[self.alice.user_id]["balance"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
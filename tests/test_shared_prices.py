@@ -0,0 +1,38 @@
+import unittest
+
+from behavioral.observer.observer import Exchange
+from behavioral.observer.shared_prices import SharedTickerTable
+from behavioral.observer.tick_history import TickHistory
+
+
+class ExchangeSharedTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = SharedTickerTable.create({"AAPL": 100.0})
+        self.history = TickHistory()
+        self.exchange = Exchange(
+            tickers={"AAPL": 100.0, "AMZN": 321.0},
+            history=self.history,
+            shared_table=self.table,
+        )
+
+    def tearDown(self):
+        self.table.close()
+
+    def test_ticker_missing_from_the_table_changes_nothing(self):
+        with self.assertRaises(ValueError):
+            self.exchange.update_ticker_price("AMZN", 330.0)
+        with self.assertRaises(ValueError):
+            self.exchange.update_ticker_prices({"AAPL": 101.0, "AMZN": 330.0})
+
+        self.assertNotIn("AMZN", self.history)
+        self.assertNotIn("AAPL", self.history)
+        self.assertEqual(self.table.read("AAPL"), 100.0)
+
+    def test_published_prices_are_shared(self):
+        self.exchange.update_ticker_prices({"AAPL": 101.0})
+        self.assertEqual(self.table.read("AAPL"), 101.0)
+        self.assertEqual(len(self.history["AAPL"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from behavioral.command.spatial_index import GeoGridIndex, haversine_km
+
+
+class GeoGridIndexTest(unittest.TestCase):
+    def setUp(self):
+        generator = random.Random(0)
+        self.index = GeoGridIndex()
+        self.points = {}
+        for i in range(20_000):
+            latitude: float = generator.uniform(-60, 60)
+            longitude: float = generator.uniform(-180, 180)
+            self.points[str(i)] = (latitude, longitude)
+            self.index.insert(str(i), latitude, longitude)
+        self.queries = [
+            (generator.uniform(-60, 60), generator.uniform(-180, 180))
+            for _ in range(50)
+        ]
+
+    def test_nearest_matches_brute_force(self):
+        for latitude, longitude in self.queries:
+            distances = sorted(
+                haversine_km(latitude, longitude, *position)
+                for position in self.points.values()
+            )
+            for k in (1, 10, 50):
+                expected = distances[:k]
+                found = [
+                    distance
+                    for _, distance in self.index.nearest(latitude, longitude, k)
+                ]
+                self.assertEqual(len(found), k)
+                for found_distance, expected_distance in zip(found, expected):
+                    self.assertAlmostEqual(found_distance, expected_distance)
+
+    def test_within_box_matches_brute_force(self):
+        for latitude, longitude in self.queries:
+            box = (latitude - 1, longitude - 1, latitude + 1, longitude + 1)
+            expected = {
+                key
+                for key, (point_latitude, point_longitude) in self.points.items()
+                if box[0] <= point_latitude <= box[2]
+                and box[1] <= point_longitude <= box[3]
+            }
+            self.assertEqual(set(self.index.within_box(*box)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import pickle
+import time
+import unittest
+
+from behavioral.chain_of_responsibility.chain_of_responsibility import (
+    ADMIN_GROUP_NAME,
+    AuthorizationHandler,
+    UserGroupHandler,
+)
+from behavioral.chain_of_responsibility.exceptions import InvalidRequestError
+from behavioral.chain_of_responsibility.request import Request
+from behavioral.chain_of_responsibility.token_cache import TokenCache
+
+
+class TokenCacheTest(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = TokenCache()
+        self.assertIsNone(cache.get(b"token"))
+        cache.put(b"token", {"group": ADMIN_GROUP_NAME})
+        self.assertEqual(cache.get(b"token"), {"group": ADMIN_GROUP_NAME})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_entries_expire_after_ttl(self):
+        cache = TokenCache(ttl=0.05)
+        cache.put(b"token", {"group": ADMIN_GROUP_NAME})
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(b"token"))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_entries=2)
+        cache.put(b"first", {"name": "first"})
+        cache.put(b"second", {"name": "second"})
+        cache.get(b"first")
+        cache.put(b"third", {"name": "third"})
+        self.assertIsNone(cache.get(b"second"))
+        self.assertIsNotNone(cache.get(b"first"))
+        self.assertIsNotNone(cache.get(b"third"))
+
+    def test_changing_a_returned_token_does_not_change_the_cache(self):
+        cache = TokenCache()
+        decoded_token = {"group": ADMIN_GROUP_NAME, "roles": ["reader"]}
+        cache.put(b"token", decoded_token)
+        decoded_token["group"] = "user"
+        cache.get(b"token")["roles"].append("writer")
+        self.assertEqual(
+            cache.get(b"token"), {"group": ADMIN_GROUP_NAME, "roles": ["reader"]}
+        )
+
+    def test_changed_request_user_does_not_leak_into_later_requests(self):
+        auth_handler = AuthorizationHandler(token_cache=TokenCache())
+        auth_handler.set_next_handler(UserGroupHandler())
+        token: bytes = pickle.dumps({"name": "Aleksei", "group": ADMIN_GROUP_NAME})
+
+        for _ in range(2):
+            request = Request(headers={"Authorization": token}, body={})
+            auth_handler.validate(request)
+            request.user["group"] = "user"
+
+        request = Request(headers={"Authorization": token}, body={})
+        try:
+            auth_handler.validate(request)
+        except InvalidRequestError as e:
+            self.fail(f"A cached token was changed by another request: {e}")
+
+
+if __name__ == "__main__":
+    unittest.main()
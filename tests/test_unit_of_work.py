@@ -0,0 +1,64 @@
+import unittest
+import uuid
+
+from behavioral.memento.db_models import DB, UnitOfWork, User
+from behavioral.memento.memento import (
+    CommandInterface,
+    Transaction,
+    UpdateBalanceCommand,
+)
+
+
+class FailingUpdateCommand(CommandInterface):
+    """
+    Fails after changing the balance, before it reaches the undo log.
+    """
+
+    def __init__(self, user: User):
+        self._user = user
+
+    def execute(self):
+        self._user.update(balance=0)
+        raise RuntimeError("The command failed")
+
+    def undo(self):
+        pass
+
+
+class UnitOfWorkTest(unittest.TestCase):
+    def setUp(self):
+        self.user = User(str(uuid.uuid4()), "Bob", "bob_pass", 100)
+        self.user.save()
+        self.unit_of_work = UnitOfWork()
+        self.unit_of_work.register(self.user)
+
+    def test_commit_writes_each_model_once(self):
+        for balance in (90, 80, 70):
+            self.user.update(balance=balance)
+        self.assertEqual(DB[self.user.user_id]["balance"], 100)
+        self.unit_of_work.commit()
+        self.assertEqual(DB[self.user.user_id]["balance"], 70)
+        self.assertEqual((self.unit_of_work.updates, self.unit_of_work.writes), (3, 1))
+
+    def test_discard_reloads_the_model(self):
+        self.user.update(balance=5)
+        self.unit_of_work.discard()
+        self.assertEqual(DB[self.user.user_id]["balance"], 100)
+        self.assertEqual(User.get(self.user.user_id).balance, 100)
+
+    def test_models_are_detached_after_commit(self):
+        self.unit_of_work.commit()
+        self.user.update(balance=50)
+        self.assertEqual(DB[self.user.user_id]["balance"], 50)
+
+    def test_rollback_reloads_changes_outside_the_undo_log(self):
+        transaction = Transaction(unit_of_work=self.unit_of_work)
+        transaction.register_command(FailingUpdateCommand(self.user))
+        transaction.register_command(UpdateBalanceCommand(self.user, 70))
+        transaction.execute()
+        self.assertEqual(DB[self.user.user_id]["balance"], 100)
+        self.assertEqual(User.get(self.user.user_id).balance, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import requests
+
+from behavioral.command.carrier import Carrier
+from behavioral.command.command import (
+    AssignCarrierToZoneCommand,
+    BatchAssignCarriersToZoneCommand,
+)
+from behavioral.command.zone_api_client import ZoneApiClient
+from behavioral.command.zone_api_stub import ZoneApiStubServer
+
+
+class ZoneApiClientTest(unittest.TestCase):
+    def start_server(self, **options) -> ZoneApiStubServer:
+        server = ZoneApiStubServer(**options)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def create_client(self, server: ZoneApiStubServer, **options) -> ZoneApiClient:
+        client = ZoneApiClient(server.url, backoff_factor=0, **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_failed_calls_are_retried(self):
+        server = self.start_server(failures_to_inject=2)
+        client = self.create_client(server, max_retries=3)
+        client.send("PUT", "zones/1", {"latitude": 1.0, "longitude": 2.0})
+        self.assertEqual(server.requests, 3)
+        self.assertIn("1", server.zones)
+
+    def test_error_is_raised_when_retries_run_out(self):
+        server = self.start_server(failures_to_inject=5)
+        client = self.create_client(server, max_retries=1)
+        with self.assertRaises(requests.HTTPError):
+            client.send("PUT", "zones/1", {"latitude": 1.0, "longitude": 2.0})
+        self.assertEqual(server.requests, 2)
+
+    def test_connections_are_reused(self):
+        server = self.start_server()
+        client = self.create_client(server)
+        for i in range(20):
+            client.send("PUT", f"zones/{i}", {"latitude": 1.0, "longitude": 2.0})
+        self.assertEqual(server.connections, 1)
+
+    def test_send_many_uses_at_most_max_connections(self):
+        server = self.start_server(latency=0.01)
+        client = self.create_client(server, max_connections=4)
+        calls = [
+            ("PUT", f"zones/{i}", {"latitude": 1.0, "longitude": 2.0})
+            for i in range(40)
+        ]
+        responses = client.send_many(calls)
+        self.assertEqual([response.status_code for response in responses], [200] * 40)
+        self.assertEqual(len(server.zones), 40)
+        self.assertLessEqual(server.connections, 4)
+
+    def test_batch_assign_and_unassign(self):
+        server = self.start_server()
+        client = self.create_client(server)
+        carriers = [Carrier("John", "Doe", 12.32 + i, 54.21) for i in range(10)]
+        command = BatchAssignCarriersToZoneCommand(carriers, client)
+
+        command.execute()
+        self.assertEqual(
+            set(server.zones), {carrier.carrier_id for carrier in carriers}
+        )
+        self.assertEqual(server.zones[carriers[3].carrier_id]["latitude"], 15.32)
+        command.undo()
+        self.assertEqual(server.zones, {})
+        self.assertEqual(server.requests, 2)
+
+    def test_assign_one_carrier(self):
+        server = self.start_server()
+        client = self.create_client(server)
+        carrier = Carrier("John", "Doe", 12.32, 54.21)
+        command = AssignCarrierToZoneCommand(carrier, client)
+
+        command.execute()
+        self.assertEqual(
+            server.zones, {carrier.carrier_id: {"latitude": 12.32, "longitude": 54.21}}
+        )
+        command.undo()
+        self.assertEqual(server.zones, {})
+
+
+if __name__ == "__main__":
+    unittest.main()